@@ -36,7 +36,7 @@ from .ast import (
 from .codegen import generate_javascript, generate_python, generate_rust
 from .compiler import IR, CompileError, Compiler, ResolvedVar
 from .executor import Context, ExecutionError, Executor, Result, run
-from .model import CompareResult, Model, RunResult
+from .model import CompareResult, DecileIndex, Model, RunResult
 from .native import CompiledBinary, compile_to_binary
 from .parser import Lexer, ParseError, Parser, parse, parse_file
 from .schema import Data, Entity, Field, ForeignKey, ReverseRelation, Schema
@@ -108,6 +108,7 @@ __all__ = [
     "Model",
     "RunResult",
     "CompareResult",
+    "DecileIndex",
     # Test runner
     "load_tests",
     "run_tests",
@@ -115,7 +115,7 @@ class RustGenerator:
 
         lines = [
             f"impl {type_name}Output {{",
-            "    #[inline]",
+            "    #[inline(always)]",
             f"    pub fn compute(input: &{type_name}Input, scalars: &Scalars) -> Self {{",
         ]
 
@@ -6,7 +6,7 @@ from pydantic import BaseModel, ConfigDict
 
 from . import ast
 from .compiler import IR
-from .schema import Data
+from .schema import MISSING, Data
 
 
 class ExecutionError(Exception):
@@ -22,18 +22,28 @@ class Context(BaseModel):
     computed: dict[str, Any] = {}
     current_row: dict | None = None
     current_entity: str | None = None
+    current_columns: dict[str, Any] | None = None
+    current_index: int = 0
 
     def get(self, path: str) -> Any:
         if path in self.computed:
             return self.computed[path]
         if self.current_row and path in self.current_row:
             return self.current_row[path]
+        if self.current_columns is not None and path in self.current_columns:
+            value = self.current_columns[path][self.current_index]
+            if value is not MISSING:
+                return value
         raise ExecutionError(f"undefined: {path}")
 
     def get_related(self, entity: str, fk_field: str) -> list[dict]:
-        if self.current_row is None:
+        if self.current_row is not None:
+            pk = self.current_row.get("id")
+        elif self.current_columns is not None:
+            ids = self.current_columns.get("id")
+            pk = ids[self.current_index] if ids is not None else None
+        else:
             raise ExecutionError("no current row for relation lookup")
-        pk = self.current_row.get("id")
         return self.data.get_related(entity, fk_field, pk)
 
     def get_fk_target(self, fk_value: Any, target_entity: str) -> dict | None:
@@ -156,6 +166,8 @@ class Executor:
     def execute(self, data: Data) -> Result:
         ctx = Context(data=data)
         entities: dict[str, dict[str, list[Any]]] = {}
+        # Input columns plus entity variables computed so far, per entity
+        columns: dict[str, dict[str, Any]] = {}
 
         for path in self.ir.order:
             var = self.ir.variables[path]
@@ -164,23 +176,22 @@ class Executor:
                 ctx.computed[path] = evaluate(var.expr, ctx)
             else:
                 entity_name = var.entity
-                rows = data.get_rows(entity_name)
-
-                if entity_name not in entities:
-                    entities[entity_name] = {}
-                entities[entity_name][path] = []
-
-                for i, row in enumerate(rows):
-                    augmented = dict(row)
-                    for prev_path, prev_vals in entities.get(entity_name, {}).items():
-                        if len(prev_vals) > i:
-                            augmented[prev_path] = prev_vals[i]
-                    ctx.current_row = augmented
-                    ctx.current_entity = entity_name
-                    val = evaluate(var.expr, ctx)
-                    entities[entity_name][path].append(val)
-                    ctx.current_row = None
-                    ctx.current_entity = None
+                cols = columns.get(entity_name)
+                if cols is None:
+                    cols = columns[entity_name] = dict(data.as_columns(entity_name))
+                n_rows = len(data.get_rows(entity_name))
+
+                values: list[Any] = [None] * n_rows
+                ctx.current_columns = cols
+                ctx.current_entity = entity_name
+                for i in range(n_rows):
+                    ctx.current_index = i
+                    values[i] = evaluate(var.expr, ctx)
+                ctx.current_columns = None
+                ctx.current_entity = None
+
+                entities.setdefault(entity_name, {})[path] = values
+                cols[path] = values
 
         return Result(scalars=ctx.computed, entities=entities)
 
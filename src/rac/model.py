@@ -2,16 +2,23 @@
 
 from __future__ import annotations
 
+import hashlib
+import os
+import pickle
+import sys
 from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
+from functools import cached_property
 from pathlib import Path
 
 import numpy as np
+import pydantic
 
+from . import __version__
 from .compiler import IR, Compiler
 from .executor import Context, evaluate
-from .native import CompiledBinary, compile_to_binary
+from .native import CACHE_DIR, CompiledBinary, compile_to_binary
 from .parser import parse
 from .schema import Data
 
@@ -29,7 +36,38 @@ class RunResult:
     def to_dict(self, entity: str) -> list[dict[str, float]]:
         arr = self.arrays[entity]
         names = self.output_names[entity]
-        return [{name: arr[i, j] for j, name in enumerate(names)} for i in range(len(arr))]
+        return [dict(zip(names, row)) for row in arr.tolist()]
+
+    def to_columns(self, entity: str) -> dict[str, np.ndarray]:
+        """Output columns by variable name, as views into the result array."""
+        arr = self.arrays[entity]
+        return {name: arr[:, j] for j, name in enumerate(self.output_names[entity])}
+
+
+def _name_index(output_names: dict[str, list[str]]) -> dict[str, dict[str, int]]:
+    return {
+        entity: {name: i for i, name in enumerate(names)} for entity, names in output_names.items()
+    }
+
+
+@dataclass(frozen=True)
+class DecileIndex:
+    """Income decile of each row, with the per-decile totals that don't depend on the variable."""
+
+    buckets: np.ndarray  # decile 0-9 per row
+    counts: np.ndarray
+    income_sums: np.ndarray
+
+    @classmethod
+    def from_income(cls, income_col: np.ndarray) -> DecileIndex:
+        edges = np.quantile(income_col, np.linspace(0.1, 1.0, 10))
+        # The maximum sits on the last edge; clip it into the top decile
+        buckets = np.clip(np.searchsorted(edges, income_col, side="right"), 0, 9)
+        return cls(
+            buckets=buckets,
+            counts=np.bincount(buckets, minlength=10),
+            income_sums=np.bincount(buckets, weights=income_col, minlength=10),
+        )
 
 
 @dataclass
@@ -39,42 +77,86 @@ class CompareResult:
     baseline: RunResult
     reform: RunResult
     n_rows: dict[str, int]
+    # Derived from the results, so left out of init, repr and equality
+    _b_idx: dict[str, dict[str, int]] = field(init=False, repr=False, compare=False)
+    _r_idx: dict[str, dict[str, int]] = field(init=False, repr=False, compare=False)
+    _gain_cache: dict[tuple[str, str], np.ndarray] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _decile_cache: dict[int, tuple[np.ndarray, DecileIndex]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self._b_idx = _name_index(self.baseline.output_names)
+        self._r_idx = _name_index(self.reform.output_names)
+
+    def decile_index(self, income_col: np.ndarray) -> DecileIndex:
+        """Decile buckets for ``income_col``, built once per income array."""
+        cached = self._decile_cache.get(id(income_col))
+        if cached is not None and cached[0] is income_col:
+            return cached[1]
+        index = DecileIndex.from_income(income_col)
+        self._decile_cache[id(income_col)] = (income_col, index)
+        return index
 
     def gain(self, entity: str, variable: str) -> np.ndarray:
-        b_names = self.baseline.output_names[entity]
-        r_names = self.reform.output_names[entity]
-        b_idx = b_names.index(variable)
-        r_idx = r_names.index(variable)
-        return self.reform.arrays[entity][:, r_idx] - self.baseline.arrays[entity][:, b_idx]
+        key = (entity, variable)
+        gain = self._gain_cache.get(key)
+        if gain is None:
+            b_idx = self._b_idx[entity][variable]
+            r_idx = self._r_idx[entity][variable]
+            gain = self.reform.arrays[entity][:, r_idx] - self.baseline.arrays[entity][:, b_idx]
+            # Shared between callers, so keep it read-only
+            gain.flags.writeable = False
+            self._gain_cache[key] = gain
+        return gain
 
-    def summary(self, entity: str, variable: str, income_col: np.ndarray | None = None) -> dict:
+    def summary(
+        self,
+        entity: str,
+        variable: str,
+        income_col: np.ndarray | DecileIndex | None = None,
+    ) -> dict:
         gain = self.gain(entity, variable)
         n = len(gain)
+        winners = gain > 1
+        n_winners = int(winners.sum())
+        n_losers = int((gain < -1).sum())
 
         result = {
             "n": n,
             "total_annual": float(gain.sum() * 12),
-            "mean_monthly": float(gain.mean()),
-            "winners": int((gain > 1).sum()),
-            "losers": int((gain < -1).sum()),
-            "winners_pct": float(100 * (gain > 1).sum() / n),
-            "losers_pct": float(100 * (gain < -1).sum() / n),
+            # An entity with no rows has no mean or shares: nan, not an error
+            "mean_monthly": float(gain.mean()) if n else np.nan,
+            "winners": n_winners,
+            "losers": n_losers,
+            "winners_pct": 100 * n_winners / n if n else np.nan,
+            "losers_pct": 100 * n_losers / n if n else np.nan,
         }
 
         if income_col is not None:
-            deciles = np.percentile(income_col, np.arange(10, 101, 10))
-            decile_idx = np.digitize(income_col, deciles)
+            index = (
+                income_col
+                if isinstance(income_col, DecileIndex)
+                else self.decile_index(income_col)
+            )
+            counts = index.counts
+            income_sums = index.income_sums
+            # Per-decile sums in one pass each instead of a mask per decile
+            gain_sums = np.bincount(index.buckets, weights=gain, minlength=10)
+            winner_counts = np.bincount(index.buckets, weights=winners, minlength=10)
             result["by_decile"] = []
             for d in range(10):
-                mask = decile_idx == d
-                if mask.sum() == 0:
+                count = counts[d]
+                if count == 0:
                     continue
                 result["by_decile"].append(
                     {
                         "decile": d + 1,
-                        "avg_income": float(income_col[mask].mean()),
-                        "avg_gain": float(gain[mask].mean()),
-                        "pct_winners": float(100 * (gain[mask] > 1).sum() / mask.sum()),
+                        "avg_income": float(income_sums[d] / count),
+                        "avg_gain": float(gain_sums[d] / count),
+                        "pct_winners": float(100 * winner_counts[d] / count),
                     }
                 )
 
@@ -87,11 +169,11 @@ class Model:
     def __init__(self, ir: IR, binary: CompiledBinary):
         self._ir = ir
         self._binary = binary
+        self._variable_hashes = _variable_hashes(ir)
 
     @classmethod
     def from_source(cls, *sources: str, as_of: date) -> Model:
-        modules = [parse(s) for s in sources]
-        ir = Compiler(modules).compile(as_of)
+        ir = _compile_sources(sources, as_of)
         binary = compile_to_binary(ir)
         return cls(ir, binary)
 
@@ -104,8 +186,9 @@ class Model:
     def entities(self) -> list[str]:
         return list(self._binary.entity_outputs.keys())
 
-    @property
+    @cached_property
     def scalars(self) -> dict[str, float]:
+        """Scalar variable values, evaluated once per model."""
         ctx = Context(data=Data(tables={}))
         for path in self._ir.order:
             var = self._ir.variables[path]
@@ -120,6 +203,14 @@ class Model:
         return self._binary.entity_schemas.get(entity, [])
 
     def run(self, data: dict[str, list[dict] | np.ndarray]) -> RunResult:
+        """Run the model on entity rows.
+
+        Each entity takes either a list of row dicts or a (n_rows, n_inputs)
+        array with columns in ``inputs(entity)`` order. float64 arrays are
+        passed to the native kernel by pointer without copying, in C or
+        Fortran order; Fortran (column-major) order is fastest. Other dtypes
+        are copied to float64 with a RuntimeWarning.
+        """
         arrays = self._binary.run(data)
         return RunResult(
             arrays=arrays,
@@ -127,14 +218,135 @@ class Model:
         )
 
     def compare(self, reform: Model, data: dict[str, list[dict] | np.ndarray]) -> CompareResult:
+        """Run baseline and reform on the same data.
+
+        Entities whose inputs, outputs and formulas (including everything they
+        depend on) match the baseline are not rerun; the reform result shares
+        the baseline's array for them.
+        """
+        changed = self._changed_entities(reform)
+        reform_data = {e: rows for e, rows in data.items() if e in changed}
         with ThreadPoolExecutor(max_workers=2) as executor:
             baseline_future = executor.submit(self.run, data)
-            reform_future = executor.submit(reform.run, data)
+            reform_future = executor.submit(reform.run, reform_data)
             baseline_result = baseline_future.result()
             reform_result = reform_future.result()
 
+        for entity in reform.entities:
+            if entity not in changed and entity in baseline_result.arrays:
+                reform_result.arrays[entity] = baseline_result.arrays[entity]
+                reform_result.output_names[entity] = baseline_result.output_names[entity]
+
         return CompareResult(
             baseline=baseline_result,
             reform=reform_result,
             n_rows={e: len(arr) for e, arr in baseline_result.arrays.items()},
         )
+
+    def gain(self, reform: Model, data: dict[str, list[dict] | np.ndarray]) -> RunResult:
+        """Reform minus baseline outputs, without keeping both full results.
+
+        Entities run one at a time and the difference is written into the
+        reform's output buffer, so peak memory is a single entity's pair of
+        arrays. Columns are the reform's outputs that the baseline also has.
+        Entities the reform leaves unchanged, or that share no outputs with the
+        baseline, are not run at all.
+        """
+        changed = self._changed_entities(reform)
+        arrays: dict[str, np.ndarray] = {}
+        output_names: dict[str, list[str]] = {}
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for entity, rows in data.items():
+                if entity not in reform.entities:
+                    continue
+                b_names = self.outputs(entity)
+                r_names = reform.outputs(entity)
+                b_idx = {name: i for i, name in enumerate(b_names)}
+                names = [name for name in r_names if name in b_idx]
+                output_names[entity] = names
+
+                # Unchanged, or no outputs in common (e.g. an entity only the
+                # reform defines): nothing to run
+                if entity not in changed or not names:
+                    arrays[entity] = np.zeros((len(rows), len(names)))
+                    continue
+
+                baseline_future = executor.submit(self._binary.run, {entity: rows})
+                reform_future = executor.submit(reform._binary.run, {entity: rows})
+                baseline_arr = baseline_future.result()[entity]
+                reform_arr = reform_future.result()[entity]
+                if names == b_names == r_names:
+                    arrays[entity] = np.subtract(reform_arr, baseline_arr, out=reform_arr)
+                else:
+                    r_idx = {name: i for i, name in enumerate(r_names)}
+                    arrays[entity] = (
+                        reform_arr[:, [r_idx[name] for name in names]]
+                        - baseline_arr[:, [b_idx[name] for name in names]]
+                    )
+
+        return RunResult(arrays=arrays, output_names=output_names)
+
+    def _changed_entities(self, reform: Model) -> set[str]:
+        """Entities whose reform outputs can differ from this model's."""
+        changed = set()
+        for entity in reform.entities:
+            if (
+                self.inputs(entity) != reform.inputs(entity)
+                or self.outputs(entity) != reform.outputs(entity)
+                or self._ir.schema_.entities.get(entity) != reform._ir.schema_.entities.get(entity)
+                or any(
+                    self._variable_hashes.get(path) != reform._variable_hashes[path]
+                    for path in reform.outputs(entity)
+                )
+            ):
+                changed.add(entity)
+        return changed
+
+
+def _ir_cache_tag() -> str:
+    """Identify the code that turns source into IR, so cached IR goes stale with it.
+
+    Pickled IR is pydantic models, so the Python and pydantic versions that
+    wrote it are part of the tag too.
+    """
+    package_dir = Path(__file__).parent
+    mtimes = [
+        str((package_dir / name).stat().st_mtime_ns)
+        for name in ("ast.py", "parser.py", "compiler.py", "schema.py")
+    ]
+    return "|".join([__version__, sys.version, pydantic.VERSION, *mtimes])
+
+
+def _compile_sources(sources: tuple[str, ...], as_of: date) -> IR:
+    """Parse and compile sources, reusing the IR pickled by an earlier call."""
+    key = "\0".join([_ir_cache_tag(), as_of.isoformat(), *sources])
+    path = CACHE_DIR / "ir" / f"{hashlib.sha256(key.encode()).hexdigest()[:16]}.pkl"
+    if path.exists():
+        try:
+            with path.open("rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass  # Unreadable or stale entry: recompile and overwrite it
+
+    ir = Compiler([parse(s) for s in sources]).compile(as_of)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(pickle.dumps(ir))
+    os.replace(tmp, path)
+    return ir
+
+
+def _variable_hashes(ir: IR) -> dict[str, str]:
+    """Hash each variable's formula together with the hashes of its dependencies.
+
+    Walking in topological order means a change anywhere upstream changes the
+    hash of every variable downstream of it.
+    """
+    hashes: dict[str, str] = {}
+    for path in ir.order:
+        var = ir.variables[path]
+        deps = "|".join(f"{dep}={hashes.get(dep, '')}" for dep in sorted(var.deps))
+        key = f"{var.entity}|{var.expr}|{deps}"
+        hashes[path] = hashlib.sha256(key.encode()).hexdigest()
+    return hashes
@@ -8,7 +8,7 @@ Grammar (simplified):
     temporal    = "from" DATE ["to" DATE] ":" expr
     amend       = "amend" PATH ":" temporal+
     expr        = match | cond | or_expr
-    match       = "match" expr ":" case+
+    match       = "match" expr ":" case+ ["_" "=>" expr]
     case        = pattern "=>" expr
     cond        = "if" expr ":" expr "else:" expr
     or_expr     = and_expr ("or" and_expr)*
@@ -22,14 +22,34 @@ Grammar (simplified):
 """
 
 import re
+import string
 from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
+from sys import intern
 
 from . import ast
 
+# Parsed DATE tokens. Rule files repeat the same few boundaries (dates are
+# immutable, so sharing them is safe); bounded by the distinct dates seen.
+_DATE_CACHE: dict[str, date] = {}
 
-@dataclass
+# Shared Literal nodes for the constants rules repeat most: booleans, small
+# non-negative ints and the empty string. Nothing mutates the AST after parsing,
+# so one node can stand in every place the constant appears.
+_LITERAL_CACHE: dict[tuple[type, int | str], ast.Literal] = {}
+_SHARED_INT_MAX = 1024
+
+
+def _shared_literal(value: int | str) -> ast.Literal:
+    key = (type(value), value)  # keeps True apart from 1
+    lit = _LITERAL_CACHE.get(key)
+    if lit is None:
+        lit = _LITERAL_CACHE[key] = ast.Literal(value=value)
+    return lit
+
+
+@dataclass(slots=True)
 class Token:
     type: str
     value: str
@@ -71,7 +91,7 @@ class Lexer:
         (re.compile(r"\d+"), "INT"),
         (re.compile(r'"[^"]*"'), "STRING"),
         (re.compile(r"'[^']*'"), "STRING"),
-        (re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*(/[a-zA-Z_][a-zA-Z0-9_]*)+"), "PATH"),
+        (re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*(?:/[a-zA-Z_][a-zA-Z0-9_]*)+"), "PATH"),
         (re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*"), "IDENT"),
         (re.compile(r"=>"), "ARROW"),
         (re.compile(r"<="), "LE"),
@@ -94,6 +114,44 @@ class Lexer:
         (re.compile(r"\."), "DOT"),
     ]
 
+    # All patterns as one alternation, tried in the order above. Group names must be
+    # unique, so each alternative is named by position and mapped back to its type.
+    _MASTER_RE = re.compile(
+        "|".join(f"(?P<t{i}>{pattern.pattern})" for i, (pattern, _) in enumerate(TOKEN_PATTERNS))
+    )
+    _GROUP_TYPES = {f"t{i}": ttype for i, (_, ttype) in enumerate(TOKEN_PATTERNS)}
+
+    # Operator tokens are fixed text, so they are looked up directly and only other
+    # tokens go through the regex. No other pattern can start with these characters.
+    _OPERATORS_2 = {"=>": "ARROW", "<=": "LE", ">=": "GE", "==": "EQ", "!=": "NE", "->": "FK"}
+    _OPERATORS_1 = {
+        ":": "COLON",
+        "+": "PLUS",
+        "-": "MINUS",
+        "*": "STAR",
+        "/": "SLASH",
+        "<": "LT",
+        ">": "GT",
+        "(": "LPAREN",
+        ")": "RPAREN",
+        "[": "LBRACKET",
+        "]": "RBRACKET",
+        ",": "COMMA",
+        ".": "DOT",
+    }
+    _OPERATOR_STARTS = frozenset(_OPERATORS_1) | {op[0] for op in _OPERATORS_2}
+
+    # Names, whitespace, numbers, strings and comments are scanned by dispatching on
+    # their first character (strings and comments with str.find); anything else
+    # falls back to _MASTER_RE. Each branch must produce exactly the token the
+    # TOKEN_PATTERNS entries for its class would.
+    _NAME_STARTS = frozenset(string.ascii_letters + "_")
+    _NAME_RE = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*(?:/[a-zA-Z_][a-zA-Z0-9_]*)*")
+    _NUMBER_RE = re.compile(r"(\d{4}-\d{2}-\d{2})|(\d+\.\d+)|\d+")
+    _NUMBER_TYPES = ("INT", "DATE", "FLOAT")  # by lastindex; INT has no group (None)
+    _WS_STARTS = frozenset(" \t\n\r")
+    _WS_RE = re.compile(r"\s+")
+
     def __init__(self, source: str):
         self.source = source
         self.pos = 0
@@ -103,33 +161,109 @@ class Lexer:
         self._tokenise()
 
     def _tokenise(self) -> None:
-        while self.pos < len(self.source):
-            for pattern, ttype in self.TOKEN_PATTERNS:
-                m = pattern.match(self.source, self.pos)
-                if m:
-                    value = m.group(0)
-                    if ttype == "WS":
-                        for c in value:
-                            if c == "\n":
-                                self.line += 1
-                                self.col = 1
-                            else:
-                                self.col += 1
-                    elif ttype != "COMMENT":
-                        if ttype == "IDENT" and value in self.KEYWORDS:
-                            ttype = value.upper()
-                        self.tokens.append(Token(ttype, value, self.line, self.col))
-                        self.col += len(value)
-                    self.pos += len(value)
-                    break
-            else:
-                raise ParseError(
-                    f"unexpected char: {self.source[self.pos]!r}",
-                    self.line,
-                    self.col,
-                )
-
-        self.tokens.append(Token("EOF", "", self.line, self.col))
+        # Position state and hot lookups live in locals for the loop; written
+        # back once at the end.
+        source = self.source
+        end = len(source)
+        pos, line, col = self.pos, self.line, self.col
+        append = self.tokens.append
+        master_match = self._MASTER_RE.match
+        name_match = self._NAME_RE.match
+        number_match = self._NUMBER_RE.match
+        ws_match = self._WS_RE.match
+        group_types = self._GROUP_TYPES
+        number_types = self._NUMBER_TYPES
+        keywords = self.KEYWORDS
+        name_starts = self._NAME_STARTS
+        ws_starts = self._WS_STARTS
+        operators_1 = self._OPERATORS_1
+        operators_2 = self._OPERATORS_2
+        operator_starts = self._OPERATOR_STARTS
+        while pos < end:
+            char = source[pos]
+            if char in name_starts:
+                value = name_match(source, pos).group()
+                if "/" in value:
+                    ttype = "PATH"
+                    value = intern(value)
+                elif value in keywords:
+                    ttype = value.upper()
+                else:
+                    ttype = "IDENT"
+                    value = intern(value)
+                append(Token(ttype, value, line, col))
+                n = len(value)
+                col += n
+                pos += n
+                continue
+
+            if char in ws_starts:
+                value = ws_match(source, pos).group()
+                newlines = value.count("\n")
+                if newlines:
+                    line += newlines
+                    col = len(value) - value.rfind("\n")
+                else:
+                    col += len(value)
+                pos += len(value)
+                continue
+
+            if char in operator_starts:
+                value = source[pos : pos + 2]
+                ttype = operators_2.get(value)
+                if ttype is None:
+                    value = char
+                    ttype = operators_1.get(char)
+                if ttype is not None:
+                    append(Token(ttype, value, line, col))
+                    col += len(value)
+                    pos += len(value)
+                    continue
+
+            if char.isdigit() and char.isascii():
+                m = number_match(source, pos)
+                value = m.group()
+                append(Token(number_types[m.lastindex or 0], value, line, col))
+                col += len(value)
+                pos += len(value)
+                continue
+
+            if char == '"' or char == "'":
+                stop = source.find(char, pos + 1) + 1
+                if stop:
+                    value = source[pos:stop]
+                    append(Token("STRING", value, line, col))
+                    col += len(value)
+                    pos = stop
+                    continue
+
+            if char == "#":
+                # Like the COMMENT pattern: runs to the newline, column untouched
+                pos = source.find("\n", pos)
+                if pos < 0:
+                    pos = end
+                continue
+
+            m = master_match(source, pos)
+            if m is None:
+                self.pos, self.line, self.col = pos, line, col
+                raise ParseError(f"unexpected char: {char!r}", line, col)
+            ttype = group_types[m.lastgroup]
+            value = m.group()
+            if ttype == "WS":
+                newlines = value.count("\n")
+                if newlines:
+                    line += newlines
+                    col = len(value) - value.rfind("\n")
+                else:
+                    col += len(value)
+            elif ttype != "COMMENT":
+                append(Token(ttype, value, line, col))
+                col += len(value)
+            pos = m.end()
+
+        self.pos, self.line, self.col = pos, line, col
+        append(Token("EOF", "", line, col))
 
 
 class Parser:
@@ -138,6 +272,31 @@ class Parser:
     # Metadata field names allowed in variable declarations
     METADATA_FIELDS = {"source", "label", "description", "unit"}
 
+    # Binary operator token types to (precedence, AST operator). Higher binds
+    # tighter; all levels are left-associative except comparison, which takes at
+    # most one operator (see parse_binary).
+    BINARY_OPS = {
+        "OR": (1, "or"),
+        "AND": (2, "and"),
+        "LT": (3, "<"),
+        "GT": (3, ">"),
+        "LE": (3, "<="),
+        "GE": (3, ">="),
+        "EQ": (3, "=="),
+        "NE": (3, "!="),
+        "PLUS": (4, "+"),
+        "MINUS": (4, "-"),
+        "STAR": (5, "*"),
+        "SLASH": (5, "/"),
+    }
+    CMP_PREC = 3
+
+    # Prefix operator token types to AST operator
+    UNARY_OPS = {"MINUS": "-", "NOT": "not"}
+
+    # Tokens that can start a match case pattern
+    CASE_STARTS = frozenset({"STRING", "INT", "FLOAT", "TRUE", "FALSE", "IDENT"})
+
     def __init__(self, tokens: list[Token]):
         self.tokens = tokens
         self.pos = 0
@@ -148,19 +307,23 @@ class Parser:
             return self.tokens[-1]
         return self.tokens[idx]
 
+    # The helpers below index the current token directly rather than going through
+    # peek(): the list always ends with EOF, which is never consumed, so pos stays
+    # in range.
+
     def at(self, *types: str) -> bool:
-        return self.peek().type in types
+        return self.tokens[self.pos].type in types
 
     def consume(self, ttype: str) -> Token:
-        tok = self.peek()
+        tok = self.tokens[self.pos]
         if tok.type != ttype:
             raise ParseError(f"expected {ttype}, got {tok.type}", tok.line, tok.col)
         self.pos += 1
         return tok
 
     def match(self, *types: str) -> Token | None:
-        if self.at(*types):
-            tok = self.peek()
+        tok = self.tokens[self.pos]
+        if tok.type in types:
             self.pos += 1
             return tok
         return None
@@ -285,8 +448,11 @@ class Parser:
         return values
 
     def _parse_date(self) -> date:
-        tok = self.consume("DATE")
-        return date.fromisoformat(tok.value)
+        value = self.consume("DATE").value
+        d = _DATE_CACHE.get(value)
+        if d is None:
+            d = _DATE_CACHE[value] = date.fromisoformat(value)
+        return d
 
     def parse_expr(self) -> ast.Expr:
         """Parse expression."""
@@ -294,28 +460,35 @@ class Parser:
             return self.parse_match()
         if self.at("IF"):
             return self.parse_cond()
-        return self.parse_or()
+        return self.parse_binary()
 
     def parse_match(self) -> ast.Match:
         """Parse match expression."""
         self.consume("MATCH")
-        subject = self.parse_or()
+        subject = self.parse_binary()
         self.consume("COLON")
 
         cases = []
-
-        while self.at("STRING", "INT", "FLOAT", "TRUE", "FALSE", "IDENT"):
+        default = None
+
+        while (tok := self.tokens[self.pos]).type in self.CASE_STARTS:
+            if tok.type == "IDENT" and tok.value == "_":
+                # Wildcard arm: always last, so it ends the case list.
+                self.pos += 1
+                self.consume("ARROW")
+                default = self.parse_expr()
+                break
             pattern = self.parse_primary()
             self.consume("ARROW")
             result = self.parse_expr()
             cases.append((pattern, result))
 
-        return ast.Match(subject=subject, cases=cases, default=None)
+        return ast.Match(subject=subject, cases=cases, default=default)
 
     def parse_cond(self) -> ast.Cond:
         """Parse conditional expression."""
         self.consume("IF")
-        condition = self.parse_or()
+        condition = self.parse_binary()
         self.consume("COLON")
         then_expr = self.parse_expr()
         self.consume("ELSE")
@@ -323,57 +496,45 @@ class Parser:
         else_expr = self.parse_expr()
         return ast.Cond(condition=condition, then_expr=then_expr, else_expr=else_expr)
 
-    def parse_or(self) -> ast.Expr:
-        left = self.parse_and()
-        while self.match("OR"):
-            right = self.parse_and()
-            left = ast.BinOp(op="or", left=left, right=right)
-        return left
-
-    def parse_and(self) -> ast.Expr:
-        left = self.parse_cmp()
-        while self.match("AND"):
-            right = self.parse_cmp()
-            left = ast.BinOp(op="and", left=left, right=right)
-        return left
-
-    def parse_cmp(self) -> ast.Expr:
-        left = self.parse_add()
-        op_map = {
-            "LT": "<",
-            "GT": ">",
-            "LE": "<=",
-            "GE": ">=",
-            "EQ": "==",
-            "NE": "!=",
-        }
-        if tok := self.match("LT", "GT", "LE", "GE", "EQ", "NE"):
-            right = self.parse_add()
-            return ast.BinOp(op=op_map[tok.type], left=left, right=right)
-        return left
-
-    def parse_add(self) -> ast.Expr:
-        left = self.parse_mul()
-        op_map = {"PLUS": "+", "MINUS": "-"}
-        while tok := self.match("PLUS", "MINUS"):
-            right = self.parse_mul()
-            left = ast.BinOp(op=op_map[tok.type], left=left, right=right)
-        return left
-
-    def parse_mul(self) -> ast.Expr:
+    def parse_binary(self, min_prec: int = 1) -> ast.Expr:
+        """Parse or/and/comparison/additive/multiplicative operators by precedence climbing.
+
+        Equivalent to one recursive method per level (or_expr down to mul_expr in
+        the grammar), but an operand with no operator after it costs one call
+        instead of five.
+        """
         left = self.parse_unary()
-        op_map = {"STAR": "*", "SLASH": "/"}
-        while tok := self.match("STAR", "SLASH"):
-            right = self.parse_unary()
-            left = ast.BinOp(op=op_map[tok.type], left=left, right=right)
-        return left
+        last_prec = None
+        while True:
+            tok = self.tokens[self.pos]
+            entry = self.BINARY_OPS.get(tok.type)
+            if entry is None:
+                return left
+            prec, op = entry
+            if prec < min_prec:
+                return left
+            # Operators at one level arrive in non-increasing precedence; a tighter
+            # one here is a second comparison the level below refused, and a
+            # repeated comparison is not allowed either (a < b < c).
+            if last_prec is not None and (
+                prec > last_prec or (prec == last_prec == self.CMP_PREC)
+            ):
+                return left
+            self.pos += 1
+            right = self.parse_binary(prec + 1)
+            left = ast.BinOp(op=op, left=left, right=right)
+            last_prec = prec
 
     def parse_unary(self) -> ast.Expr:
-        if self.match("MINUS"):
-            return ast.UnaryOp(op="-", operand=self.parse_unary())
-        if self.match("NOT"):
-            return ast.UnaryOp(op="not", operand=self.parse_unary())
-        return self.parse_postfix()
+        """Parse prefix operators, collected in a loop rather than by recursion."""
+        ops = []
+        while (op := self.UNARY_OPS.get(self.tokens[self.pos].type)) is not None:
+            ops.append(op)
+            self.pos += 1
+        expr = self.parse_postfix()
+        for op in reversed(ops):
+            expr = ast.UnaryOp(op=op, operand=expr)
+        return expr
 
     def parse_postfix(self) -> ast.Expr:
         """Parse postfix operations (function calls, field access)."""
@@ -405,15 +566,19 @@ class Parser:
     def parse_primary(self) -> ast.Expr:
         """Parse primary expression."""
         if self.at("INT"):
-            return ast.Literal(value=int(self.consume("INT").value))
+            value = int(self.consume("INT").value)
+            if value <= _SHARED_INT_MAX:
+                return _shared_literal(value)
+            return ast.Literal(value=value)
         if self.at("FLOAT"):
             return ast.Literal(value=float(self.consume("FLOAT").value))
         if self.at("STRING"):
-            return ast.Literal(value=self.consume("STRING").value[1:-1])
+            value = self.consume("STRING").value[1:-1]
+            return ast.Literal(value=value) if value else _shared_literal(value)
         if self.match("TRUE"):
-            return ast.Literal(value=True)
+            return _shared_literal(True)
         if self.match("FALSE"):
-            return ast.Literal(value=False)
+            return _shared_literal(False)
         if tok := self.match("PATH", "IDENT"):
             return ast.Var(path=tok.value)
         if self.match("LPAREN"):
@@ -3,12 +3,15 @@
 Handles relational data with primary keys, foreign keys, and reverse relations.
 """
 
+from dataclasses import dataclass, field
 from typing import Any
 
-from pydantic import BaseModel, model_validator
+# Placeholder for cells whose row omits the field entirely.
+MISSING = object()
 
 
-class Field(BaseModel):
+@dataclass(slots=True)
+class Field:
     """A field on an entity."""
 
     name: str
@@ -17,7 +20,8 @@ class Field(BaseModel):
     default: Any = None
 
 
-class ForeignKey(BaseModel):
+@dataclass(slots=True)
+class ForeignKey:
     """A foreign key relationship to another entity."""
 
     name: str
@@ -25,7 +29,8 @@ class ForeignKey(BaseModel):
     target_field: str = "id"
 
 
-class ReverseRelation(BaseModel):
+@dataclass(slots=True)
+class ReverseRelation:
     """A reverse relation (one-to-many) from another entity."""
 
     name: str
@@ -33,20 +38,22 @@ class ReverseRelation(BaseModel):
     source_field: str
 
 
-class Entity(BaseModel):
+@dataclass(slots=True)
+class Entity:
     """An entity type in the schema."""
 
     name: str
     primary_key: str = "id"
-    fields: dict[str, Field] = {}
-    foreign_keys: dict[str, ForeignKey] = {}
-    reverse_relations: dict[str, ReverseRelation] = {}
+    fields: dict[str, Field] = field(default_factory=dict)
+    foreign_keys: dict[str, ForeignKey] = field(default_factory=dict)
+    reverse_relations: dict[str, ReverseRelation] = field(default_factory=dict)
 
 
-class Schema(BaseModel):
+@dataclass(slots=True)
+class Schema:
     """Complete schema for a ruleset."""
 
-    entities: dict[str, Entity] = {}
+    entities: dict[str, Entity] = field(default_factory=dict)
 
     def add_entity(self, entity: Entity) -> None:
         self.entities[entity.name] = entity
@@ -66,29 +73,68 @@ class Schema(BaseModel):
                         )
 
 
-class Data(BaseModel):
+@dataclass(slots=True)
+class Data:
     """Input data: entity tables with rows."""
 
     tables: dict[str, list[dict[str, Any]]]
-    _index: dict[str, dict[Any, dict]] = {}
-
-    @model_validator(mode="after")
-    def build_index(self) -> "Data":
-        """Build primary key index for fast lookups."""
-        object.__setattr__(self, "_index", {})
-        for entity_name, rows in self.tables.items():
-            self._index[entity_name] = {}
-            for row in rows:
-                pk = row.get("id")
-                if pk is not None:
-                    self._index[entity_name][pk] = row
-        return self
+    # Derived from tables, so left out of init, repr and equality
+    _index: dict[str, dict[Any, dict]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _columns: dict[str, dict[str, list[Any]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _fk_index: dict[tuple[str, str], dict[Any, list[dict]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
     def get_row(self, entity: str, pk: Any) -> dict | None:
-        return self._index.get(entity, {}).get(pk)
+        """Row of ``entity`` whose ``id`` is ``pk``.
+
+        Each table's primary key index is built on its first lookup, so
+        tables that are never queried by key are never indexed.
+        """
+        index = self._index.get(entity)
+        if index is None:
+            index = {row.get("id"): row for row in self.tables.get(entity, [])}
+            index.pop(None, None)  # rows without an id are not addressable
+            self._index[entity] = index
+        return index.get(pk)
 
     def get_rows(self, entity: str) -> list[dict]:
         return self.tables.get(entity, [])
 
     def get_related(self, entity: str, fk_field: str, fk_value: Any) -> list[dict]:
-        return [row for row in self.tables.get(entity, []) if row.get(fk_field) == fk_value]
+        """Rows of ``entity`` whose ``fk_field`` equals ``fk_value``.
+
+        The rows are grouped by ``fk_field`` on the first lookup, so later
+        lookups on the same field are a dict hit rather than a table scan.
+        """
+        index = self._fk_index.get((entity, fk_field))
+        if index is None:
+            index = {}
+            for row in self.tables.get(entity, []):
+                index.setdefault(row.get(fk_field), []).append(row)
+            self._fk_index[(entity, fk_field)] = index
+        return list(index.get(fk_value, ()))
+
+    def as_columns(self, entity: str) -> dict[str, list[Any]]:
+        """Per-field value lists for an entity table, built once and cached.
+
+        Cells keep the caller's values unchanged, so formulas see the same
+        Python ints, floats and bools as the rows. Cells missing from a row
+        hold ``MISSING``.
+        """
+        columns = self._columns.get(entity)
+        if columns is not None:
+            return columns
+
+        rows = self.tables.get(entity, [])
+        names: dict[str, None] = {}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+
+        columns = {name: [row.get(name, MISSING) for row in rows] for name in names}
+        self._columns[entity] = columns
+        return columns
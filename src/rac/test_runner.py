@@ -27,19 +27,33 @@ CLI usage:
 
 from __future__ import annotations
 
+import hashlib
+import json
 import math
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
 
 import yaml
+from pydantic import BaseModel
 
+from . import __version__
 from . import ast as rac_ast
 from .compiler import IR, Compiler
 from .executor import Context, evaluate
+from .native import CACHE_DIR
 from .schema import Data
 
+# libyaml's C loader when PyYAML was built with it; same results, much faster
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Layout of the JSON test cache rows; bump to invalidate existing entries
+_TESTS_CACHE_VERSION = 1
+
 
 @dataclass
 class TestCase:
@@ -95,13 +109,18 @@ class TestResults:
         return [r for r in self.results if not r.passed]
 
 
+@lru_cache(maxsize=256)
 def _parse_period(period_str: str) -> date:
     """Parse a period string like '2024-01' into a date.
 
     Supports:
         '2024-01'     -> date(2024, 1, 1)
         '2024-01-15'  -> date(2024, 1, 15)
+
+    Cases in a file mostly share a few periods, so results are cached.
     """
+    if len(period_str) == 7 and period_str[4] == "-":
+        return date(int(period_str[:4]), int(period_str[5:]), 1)
     parts = period_str.split("-")
     if len(parts) == 2:
         return date(int(parts[0]), int(parts[1]), 1)
@@ -111,6 +130,9 @@ def _parse_period(period_str: str) -> date:
 def load_tests(path: Path) -> list[TestCase]:
     """Parse a .rac.test file into a list of TestCase objects.
 
+    Parsed cases are cached as JSON under the rac cache directory, keyed on the
+    file's path, mtime and size; set ``RAC_TEST_NOCACHE=1`` to bypass the cache.
+
     Args:
         path: Path to a .rac.test file (YAML format).
 
@@ -124,8 +146,77 @@ def load_tests(path: Path) -> list[TestCase]:
     if not path.exists():
         raise FileNotFoundError(f"Test file not found: {path}")
 
-    content = path.read_text()
-    data = yaml.safe_load(content)
+    cache = None
+    if os.environ.get("RAC_TEST_NOCACHE") != "1":
+        cache = _tests_cache_path(path)
+        cached = _read_tests_cache(cache)
+        if cached is not None:
+            return cached
+
+    test_cases = _parse_tests(path)
+    if cache is not None:
+        _write_tests_cache(cache, test_cases)
+    return test_cases
+
+
+def _tests_cache_path(path: Path) -> Path:
+    """JSON cache entry for a .rac.test file, keyed on its location, mtime and size.
+
+    The key also carries the package version and this module's mtime, so an
+    upgrade or local edit to the loader never serves entries it did not write.
+    """
+    stat = path.stat()
+    code = f"{_TESTS_CACHE_VERSION}|{__version__}|{Path(__file__).stat().st_mtime_ns}"
+    key = f"{code}\0{path.resolve()}\0{stat.st_mtime_ns}\0{stat.st_size}"
+    return CACHE_DIR / "tests" / f"{hashlib.sha256(key.encode()).hexdigest()[:16]}.json"
+
+
+def _read_tests_cache(cache: Path) -> list[TestCase] | None:
+    """Cached test cases, or None if the entry is missing or unreadable."""
+    try:
+        rows = json.loads(cache.read_bytes())
+        return [
+            TestCase(
+                name=name,
+                variable=variable,
+                period=date.fromisoformat(period),
+                inputs=inputs,
+                expected=expected,
+            )
+            for name, variable, period, inputs, expected in rows
+        ]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_tests_cache(cache: Path, test_cases: list[TestCase]) -> None:
+    """Store parsed test cases, unless JSON cannot reproduce them exactly.
+
+    YAML can hold values JSON cannot (dates, non-string keys, NaN), so files
+    using them are simply re-parsed each time.
+    """
+    rows = [
+        [tc.name, tc.variable, tc.period.isoformat(), tc.inputs, tc.expected]
+        for tc in test_cases
+    ]
+    try:
+        text = json.dumps(rows)
+    except (TypeError, ValueError):
+        return
+    if json.loads(text) != rows:
+        return
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text)
+        os.replace(tmp, cache)
+    except OSError:
+        pass  # Caching is best-effort
+
+
+def _parse_tests(path: Path) -> list[TestCase]:
+    with path.open("rb") as f:
+        data = yaml.load(f, Loader=_YAML_LOADER)
 
     if data is None:
         return []
@@ -218,6 +309,18 @@ def _build_ir_for_test(test: TestCase) -> IR:
     raise NotImplementedError("Direct IR building not yet supported")
 
 
+@lru_cache(maxsize=128)
+def _parse_module(path: str, mtime_ns: int, size: int) -> rac_ast.Module:
+    """Parse a .rac file, reusing the AST while its mtime and size are unchanged.
+
+    Nothing downstream mutates the AST, so one parse can serve every run of
+    the file in this process (each pool worker keeps its own cache).
+    """
+    from .parser import parse as rac_parse
+
+    return rac_parse(Path(path).read_text(), path)
+
+
 def run_tests(
     rac_path: Path,
     test_path: Path,
@@ -227,8 +330,8 @@ def run_tests(
 
     The .rac file is parsed and compiled. For each test case, the inputs are
     injected as scalar variables (overriding any existing definitions), the
-    module is compiled for the test's period date, and the target variable
-    is evaluated.
+    module is compiled for the test's period date (once per distinct period),
+    and the target variable is evaluated.
 
     Args:
         rac_path: Path to the .rac source file.
@@ -238,67 +341,163 @@ def run_tests(
     Returns:
         TestResults with pass/fail for each test case.
     """
-    from .parser import parse as rac_parse
-
     if not rac_path.exists():
         raise FileNotFoundError(f"RAC file not found: {rac_path}")
 
-    source = rac_path.read_text()
-    module = rac_parse(source, str(rac_path))
+    stat = rac_path.stat()
+    module = _parse_module(str(rac_path), stat.st_mtime_ns, stat.st_size)
     test_cases = load_tests(test_path)
 
     results = TestResults()
 
+    # Cases usually share a handful of periods, targets and input names, so
+    # the work that depends only on those is done once per file (and kept for
+    # later runs of the same unchanged file).
+    cache = _run_cache(str(rac_path), stat.st_mtime_ns, stat.st_size)
     for test in test_cases:
-        result = _run_single_test(module, test, tolerance)
+        result = _run_single_test(module, test, tolerance, cache)
         results.results.append(result)
 
     return results
 
 
 def _collect_deps(path: str, ir: IR, collected: set[str]) -> None:
-    """Recursively collect all dependencies of a variable."""
-    if path in collected:
-        return
-    collected.add(path)
-    if path in ir.variables:
-        for dep in ir.variables[path].deps:
-            _collect_deps(dep, ir, collected)
+    """Collect a variable and all of its transitive dependencies.
+
+    Walks an explicit stack rather than recursing, so deep chains cannot hit
+    the recursion limit.
+    """
+    variables = ir.variables
+    stack = [path]
+    while stack:
+        p = stack.pop()
+        if p in collected:
+            continue
+        collected.add(p)
+        var = variables.get(p)
+        if var is not None:
+            stack.extend(var.deps)
+
+
+@dataclass
+class _RunCache:
+    """Work shared by the test cases of one module (see run_tests)."""
+
+    irs: dict[date, IR] = field(default_factory=dict)
+    deps: dict[tuple[date, str], set[str]] = field(default_factory=dict)
+    # Values of the needed variables no test input can reach, per (period,
+    # variable, input names); None if evaluating them raised.
+    bases: dict[tuple[date, str, frozenset[str]], dict[str, object] | None] = field(
+        default_factory=dict
+    )
+    # Sorted variable names per period, for "not found" errors
+    available: dict[date, list[str]] = field(default_factory=dict)
+
+
+@lru_cache(maxsize=128)
+def _run_cache(path: str, mtime_ns: int, size: int) -> _RunCache:
+    """The _RunCache for a .rac file, kept while its mtime and size are unchanged.
+
+    Keyed like _parse_module, so each (file, period) is compiled once per
+    process however many times the file's tests are run.
+    """
+    return _RunCache()
+
+
+def _names_read(expr: rac_ast.Expr) -> set[str]:
+    """Every name an expression looks up, bare names included.
+
+    ``ResolvedVar.deps`` only records paths, but test inputs may be bare names.
+    """
+    names: set[str] = set()
+    stack: list[object] = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, rac_ast.Var):
+            names.add(node.path)
+        elif isinstance(node, BaseModel):
+            stack.extend(getattr(node, name) for name in type(node).model_fields)
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+    return names
+
+
+def _input_free_values(
+    ir: IR, needed: set[str], inputs: frozenset[str]
+) -> dict[str, object] | None:
+    """Evaluate the needed scalar variables that read no test input, directly or not.
+
+    These are the same for every case with the same period, target and input
+    names. Returns None if any of them fails, leaving each case to evaluate
+    (and report) everything itself.
+    """
+    tainted = set(inputs)
+    ctx = Context(data=Data(tables={}))
+    for path in ir.order:
+        if path not in needed or path in tainted:
+            continue
+        var = ir.variables[path]
+        if not tainted.isdisjoint(_names_read(var.expr)):
+            tainted.add(path)
+        elif var.entity is None:
+            try:
+                ctx.computed[path] = evaluate(var.expr, ctx)
+            except Exception:
+                return None
+    return ctx.computed
 
 
 def _run_single_test(
     module: rac_ast.Module,
     test: TestCase,
     tolerance: float,
+    cache: _RunCache | None = None,
 ) -> TestResult:
     """Run a single test case against a parsed module.
 
     Strategy: compile the module for the test's period, then inject input
     values as pre-computed scalars in the execution context. Only evaluate
     variables in the dependency chain of the target variable.
+
+    *cache*, when given, carries the compiled IR, dependency sets and
+    input-independent values over to later cases of the same module.
     """
+    cache = cache if cache is not None else _RunCache()
     try:
         # Compile for the test date
-        compiler = Compiler([module])
-        ir = compiler.compile(test.period)
+        ir = cache.irs.get(test.period)
+        if ir is None:
+            ir = cache.irs[test.period] = Compiler([module]).compile(test.period)
 
         # Check that the target variable exists in the IR
         if test.variable not in ir.variables:
+            available = cache.available.get(test.period)
+            if available is None:
+                available = cache.available[test.period] = sorted(ir.variables.keys())
             return TestResult(
                 test=test,
                 passed=False,
                 error=(
                     f"Variable '{test.variable}' not found in compiled IR. "
-                    f"Available: {sorted(ir.variables.keys())}"
+                    f"Available: {available}"
                 ),
             )
 
         # Collect only the variables needed for the target
-        needed: set[str] = set()
-        _collect_deps(test.variable, ir, needed)
+        key = (test.period, test.variable)
+        needed = cache.deps.get(key)
+        if needed is None:
+            needed = cache.deps[key] = set()
+            _collect_deps(test.variable, ir, needed)
+
+        # Start from the values no input can change, evaluated once per group
+        base_key = (test.period, test.variable, frozenset(test.inputs))
+        if base_key not in cache.bases:
+            cache.bases[base_key] = _input_free_values(ir, needed, base_key[2])
+        base = cache.bases[base_key]
 
         # Build execution context with test inputs pre-loaded
-        ctx = Context(data=Data(tables={}))
+        ctx = Context(data=Data(tables={}), computed=dict(base or {}))
 
         # Inject all test inputs upfront (they may be bare names or paths)
         for input_name, input_val in test.inputs.items():
@@ -370,25 +569,74 @@ def find_test_pairs(path: Path) -> list[tuple[Path, Path]]:
         else:
             return []
 
-    # Directory: find all .rac.test files and pair them
-    pairs: list[tuple[Path, Path]] = []
-    for test_file in sorted(path.rglob("*.rac.test")):
-        rac_file = test_file.parent / test_file.name.removesuffix(".test")
-        pairs.append((rac_file, test_file))
-    return pairs
+    # Directory: find all .rac.test files and pair them. os.walk filters on bare
+    # names, so only matching files become Path objects.
+    test_files = [
+        Path(dirpath, name)
+        for dirpath, _, filenames in os.walk(path)
+        for name in filenames
+        if name.endswith(".rac.test")
+    ]
+    return [
+        (test_file.parent / test_file.name.removesuffix(".test"), test_file)
+        for test_file in sorted(test_files)
+    ]
+
+
+def _run_pair(
+    rac_path: Path,
+    test_path: Path,
+    tolerance: float,
+) -> tuple[list[TestResult], list[str]]:
+    """Run one .rac / .rac.test pair, returning its results and verbose output lines.
+
+    Module-level (and print-free) so it can run in a worker process; the caller
+    prints the lines, keeping output grouped per file.
+    """
+    lines = [f"\n--- {test_path.name} ---"]
+    results: list[TestResult] = []
+
+    if not rac_path.exists():
+        # Still load tests to report them as errors
+        try:
+            for tc in load_tests(test_path):
+                results.append(
+                    TestResult(test=tc, passed=False, error=f"RAC file not found: {rac_path}")
+                )
+                lines.append(f"  FAIL  {tc.name}: RAC file not found")
+        except Exception as exc:
+            lines.append(f"  ERROR loading tests: {exc}")
+        return results, lines
+
+    try:
+        results = run_tests(rac_path, test_path, tolerance).results
+    except Exception as exc:
+        lines.append(f"  ERROR: {exc}")
+        return results, lines
+
+    for r in results:
+        status = "PASS" if r.passed else "FAIL"
+        msg = f"  {status}  {r.test.name}"
+        if not r.passed and r.error:
+            msg += f" -- {r.error}"
+        lines.append(msg)
+    return results, lines
 
 
 def run_test_suite(
     path: Path,
     tolerance: float = 0.01,
     verbose: bool = False,
+    jobs: int = 1,
 ) -> TestResults:
     """Run all tests found at a path (file or directory).
 
     Args:
         path: A .rac file, .rac.test file, or directory.
         tolerance: Absolute tolerance for numeric comparisons.
-        verbose: Print individual test results as they run.
+        verbose: Print individual test results as each file finishes.
+        jobs: Number of worker processes; file pairs are independent, so with
+            more than one they are run in parallel. Results keep file order.
 
     Returns:
         Aggregated TestResults.
@@ -401,43 +649,18 @@ def run_test_suite(
             print(f"No .rac.test files found at {path}")
         return all_results
 
-    for rac_path, test_path in pairs:
-        if verbose:
-            print(f"\n--- {test_path.name} ---")
-
-        if not rac_path.exists():
-            # Still load tests to report them as errors
-            try:
-                test_cases = load_tests(test_path)
-                for tc in test_cases:
-                    result = TestResult(
-                        test=tc,
-                        passed=False,
-                        error=f"RAC file not found: {rac_path}",
-                    )
-                    all_results.results.append(result)
-                    if verbose:
-                        print(f"  FAIL  {tc.name}: RAC file not found")
-            except Exception as exc:
-                if verbose:
-                    print(f"  ERROR loading tests: {exc}")
-            continue
-
-        try:
-            results = run_tests(rac_path, test_path, tolerance)
-        except Exception as exc:
-            if verbose:
-                print(f"  ERROR: {exc}")
-            continue
+    args = ([r for r, _ in pairs], [t for _, t in pairs], [tolerance] * len(pairs))
+    jobs = min(jobs, len(pairs))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            outcomes = list(pool.map(_run_pair, *args))
+    else:
+        outcomes = map(_run_pair, *args)
 
-        for r in results.results:
-            all_results.results.append(r)
-            if verbose:
-                status = "PASS" if r.passed else "FAIL"
-                msg = f"  {status}  {r.test.name}"
-                if not r.passed and r.error:
-                    msg += f" -- {r.error}"
-                print(msg)
+    for results, lines in outcomes:
+        all_results.results.extend(results)
+        if verbose:
+            print("\n".join(lines))
 
     return all_results
 
@@ -456,12 +679,14 @@ def main(argv: list[str] | None = None) -> None:
         "\n"
         "Options:\n"
         "  --tolerance N   Floating-point tolerance (default: 0.01)\n"
+        "  --jobs N, -j N  Worker processes (default: number of CPUs)\n"
         "  --verbose, -v   Print individual test results\n"
         "  --help, -h      Show this message\n"
     )
 
     tolerance = 0.01
     verbose = False
+    jobs = os.cpu_count() or 1
     paths: list[str] = []
 
     i = 0
@@ -476,6 +701,12 @@ def main(argv: list[str] | None = None) -> None:
                 print("Error: --tolerance requires a value", file=sys.stderr)
                 sys.exit(2)
             tolerance = float(args[i])
+        elif arg in ("--jobs", "-j"):
+            i += 1
+            if i >= len(args):
+                print(f"Error: {arg} requires a value", file=sys.stderr)
+                sys.exit(2)
+            jobs = int(args[i])
         elif arg in ("--verbose", "-v"):
             verbose = True
         elif arg.startswith("-"):
@@ -499,7 +730,7 @@ def main(argv: list[str] | None = None) -> None:
             print(f"Error: {target} not found", file=sys.stderr)
             sys.exit(1)
 
-        results = run_test_suite(target, tolerance=tolerance, verbose=verbose)
+        results = run_test_suite(target, tolerance=tolerance, verbose=verbose, jobs=jobs)
         all_results.results.extend(results.results)
 
     # Summary
@@ -86,20 +86,29 @@ PERIOD_PATTERN = re.compile(
 DTYPE_PATTERN = re.compile(r"^\s*dtype:\s*(\w+)")
 PARAMETER_PATTERN = re.compile(r"^parameter\s+(\w+):")
 LEGISLATION_ANTIPATTERNS = [
-    (r"pre_tcja|post_tcja|tcja_", "TCJA"),
-    (r"pre_aca|post_aca|aca_", "ACA"),
-    (r"pre_arpa|post_arpa|arpa_", "ARPA"),
-    (r"pre_arra|post_arra|arra_", "ARRA"),
-    (r"pre_tra|post_tra|tra97_|tra01_", "TRA"),
-    (
-        r"_2017_|_2018_|_2019_|_2020_|_2021_|_2022_|_2023_|_2024_",
-        "year",
-    ),
+    (re.compile(pattern, re.IGNORECASE), legislation)
+    for pattern, legislation in [
+        (r"pre_tcja|post_tcja|tcja_", "TCJA"),
+        (r"pre_aca|post_aca|aca_", "ACA"),
+        (r"pre_arpa|post_arpa|arpa_", "ARPA"),
+        (r"pre_arra|post_arra|arra_", "ARRA"),
+        (r"pre_tra|post_tra|tra97_|tra01_", "TRA"),
+        (
+            r"_2017_|_2018_|_2019_|_2020_|_2021_|_2022_|_2023_|_2024_",
+            "year",
+        ),
+    ]
 ]
 FORMULA_START = re.compile(r"^\s*formula:\s*\|")
 FORMULA_LINE = re.compile(r"^\s{4,}")
 TEMPORAL_ENTRY_PATTERN = re.compile(r"^\s+from\s+\d{4}-\d{2}-\d{2}:")
 BARE_DEFINITION_PATTERN = re.compile(r"^([a-z_][a-z0-9_]*):\s*(?!\|)")
+NAMED_DEFINITION_PATTERN = re.compile(r"^(variable|input|function|enum)\s+([a-z_][a-z0-9_]*)")
+ATTRIBUTE_PATTERN = re.compile(r"^([a-z_]+)(:|\s|$)")
+ASSIGNMENT_PATTERN = re.compile(r"^[a-z_]+\s*=")
+# Stripped from formula lines before looking for literals
+FORMULA_COMMENT_PATTERN = re.compile(r"#.*$")
+FORMULA_STRING_PATTERN = re.compile(r"['\"].*?['\"]")
 
 LITERAL_PATTERN = re.compile(
     r"""
@@ -125,11 +134,15 @@ IMPORTS_BLOCK_PATTERN = re.compile(r"^\s*imports:\s*(.*)$")
 IMPORTS_LIST_PATTERN = re.compile(r"^\s*-\s*(.+)$")
 IMPORT_PATTERN = re.compile(r"([^#\s\[\]]+)#(\w+)(?:\s+as\s+\w+)?")
 
-# Old syntax: "variable name:" / "input name:" / "parameter name:"
-VARIABLE_DEF_PATTERN = re.compile(r"^(variable|input)\s+(\w+):")
-PARAMETER_DEF_PATTERN = re.compile(r"^parameter\s+(\w+):")
-# Unified syntax: bare "name:" at column 0
-BARE_DEF_PATTERN = re.compile(r"^([a-z_][a-z0-9_]*):")
+# Definitions, matched at the start of any line of a whole file, tried in order:
+# old syntax "variable name:" / "input name:" / "parameter name:", then unified
+# syntax bare "name:" at column 0. [^\S\n] is whitespace that stays on the line.
+EXPORT_DEF_PATTERN = re.compile(
+    r"^(?:(?:variable|input)[^\S\n]+(?P<variable>\w+):"
+    r"|parameter[^\S\n]+(?P<parameter>\w+):"
+    r"|(?P<bare>[a-z_][a-z0-9_]*):)",
+    re.MULTILINE,
+)
 STRUCTURAL_KEYWORDS = {
     "imports",
     "text",
@@ -165,15 +178,17 @@ def _validate_schema_file(filepath: Path) -> list[str]:
         if in_multiline_string:
             continue
 
-        if FORMULA_START.match(line):
+        # Each pattern below needs a fixed keyword, so a substring test rules
+        # out most lines before the regex runs.
+        if "formula:" in line and FORMULA_START.match(line):
             in_formula = True
             continue
         elif in_formula and not FORMULA_LINE.match(line) and line.strip():
             in_formula = False
 
         if in_formula:
-            code_line = re.sub(r"#.*$", "", line)
-            code_line = re.sub(r"['\"].*?['\"]", "", code_line)
+            code_line = FORMULA_COMMENT_PATTERN.sub("", line)
+            code_line = FORMULA_STRING_PATTERN.sub("", code_line)
 
             for match in LITERAL_PATTERN.finditer(code_line):
                 literal = match.group(1)
@@ -192,21 +207,21 @@ def _validate_schema_file(filepath: Path) -> list[str]:
         if not stripped or stripped.startswith("#"):
             continue
 
-        if TEMPORAL_ENTRY_PATTERN.match(line):
+        if "from" in line and TEMPORAL_ENTRY_PATTERN.match(line):
             continue
 
-        param_match = PARAMETER_PATTERN.match(stripped)
+        param_match = stripped.startswith("parameter") and PARAMETER_PATTERN.match(stripped)
         if param_match:
             param_name = param_match.group(1)
             for pattern, legislation in LEGISLATION_ANTIPATTERNS:
-                if re.search(pattern, param_name, re.IGNORECASE):
+                if pattern.search(param_name):
                     errors.append(
                         f"{filepath}:{lineno}: parameter '{param_name}' "
                         f"references {legislation} - use time-varying values "
                         f"instead (e.g., 2017-12-15: new_value)"
                     )
 
-        entity_match = ENTITY_PATTERN.match(line)
+        entity_match = "entity:" in line and ENTITY_PATTERN.match(line)
         if entity_match:
             entity = entity_match.group(1)
             if entity not in VALID_ENTITIES:
@@ -215,7 +230,7 @@ def _validate_schema_file(filepath: Path) -> list[str]:
                     f"(must be one of: {sorted(VALID_ENTITIES)})"
                 )
 
-        period_match = PERIOD_PATTERN.match(line)
+        period_match = "period:" in line and PERIOD_PATTERN.match(line)
         if period_match:
             period = period_match.group(1)
             if period not in VALID_PERIODS:
@@ -224,7 +239,7 @@ def _validate_schema_file(filepath: Path) -> list[str]:
                     f"(must be one of: {sorted(VALID_PERIODS)})"
                 )
 
-        dtype_match = DTYPE_PATTERN.match(line)
+        dtype_match = "dtype:" in line and DTYPE_PATTERN.match(line)
         if dtype_match:
             dtype = dtype_match.group(1)
             if dtype not in VALID_DTYPES and not dtype.startswith("Enum"):
@@ -237,19 +252,17 @@ def _validate_schema_file(filepath: Path) -> list[str]:
         if indent > 0:
             continue
 
-        named_match = re.match(
-            r"^(variable|input|function|enum)\s+([a-z_][a-z0-9_]*)", stripped
-        )
+        named_match = NAMED_DEFINITION_PATTERN.match(stripped)
         if named_match:
             if named_match.group(1) == "function":
                 in_code_section = True
             continue
 
-        match = re.match(r"^([a-z_]+)(:|\s|$)", stripped)
+        match = ATTRIBUTE_PATTERN.match(stripped)
         if not match:
             if in_code_section:
                 continue
-            if re.match(r"^[a-z_]+\s*=", stripped):
+            if ASSIGNMENT_PATTERN.match(stripped):
                 errors.append(
                     f"{filepath}:{lineno}: assignment outside code block"
                 )
@@ -286,14 +299,20 @@ def _validate_schema_file(filepath: Path) -> list[str]:
     return errors
 
 
-def validate_schema(statute_dir: Path) -> list[str]:
+def _rac_files(statute_dir: Path) -> list[Path]:
+    return sorted(statute_dir.rglob("*.rac"))
+
+
+def validate_schema(statute_dir: Path, rac_files: list[Path] | None = None) -> list[str]:
     """Validate all .rac files in *statute_dir* against the schema.
 
+    *rac_files*, when given, is the already-walked list of files to check.
+
     Returns a list of error strings (empty means success).
     """
     errors: list[str] = []
 
-    for rac_file in sorted(statute_dir.rglob("*.rac")):
+    for rac_file in rac_files if rac_files is not None else _rac_files(statute_dir):
         errors.extend(_validate_schema_file(rac_file))
 
     return errors
@@ -309,20 +328,11 @@ def _extract_exports(filepath: Path) -> set[str]:
     exports: set[str] = set()
     try:
         content = filepath.read_text()
-        for line in content.split("\n"):
-            match = VARIABLE_DEF_PATTERN.match(line)
-            if match:
-                exports.add(match.group(2))
-                continue
-            match = PARAMETER_DEF_PATTERN.match(line)
-            if match:
-                exports.add(match.group(1))
-                continue
-            match = BARE_DEF_PATTERN.match(line)
-            if match:
-                name = match.group(1)
-                if name not in STRUCTURAL_KEYWORDS:
-                    exports.add(name)
+        for match in EXPORT_DEF_PATTERN.finditer(content):
+            kind = match.lastgroup
+            name = match.group(kind)
+            if kind != "bare" or name not in STRUCTURAL_KEYWORDS:
+                exports.add(name)
     except Exception as exc:
         print(
             f"Warning: Could not read {filepath}: {exc}", file=sys.stderr
@@ -330,6 +340,16 @@ def _extract_exports(filepath: Path) -> set[str]:
     return exports
 
 
+def _cached_exports(filepath: Path, cache: dict[Path, set[str]] | None) -> set[str]:
+    """``_extract_exports`` through an optional per-run cache."""
+    if cache is None:
+        return _extract_exports(filepath)
+    exports = cache.get(filepath)
+    if exports is None:
+        exports = cache[filepath] = _extract_exports(filepath)
+    return exports
+
+
 def _resolve_import_path(import_path: str, statute_dir: Path) -> Path | None:
     """Resolve an import path to a .rac file or directory.
 
@@ -355,10 +375,16 @@ def _resolve_import_path(import_path: str, statute_dir: Path) -> Path | None:
 
 
 def _find_variable_in_path(
-    import_path: str, variable: str, statute_dir: Path
+    import_path: str,
+    variable: str,
+    statute_dir: Path,
+    exports_cache: dict[Path, set[str]] | None = None,
 ) -> tuple[bool, str]:
     """Check whether *variable* is exported from *import_path*.
 
+    *exports_cache*, when given, maps files to their exports so that a file
+    imported from many places is read once.
+
     Returns ``(found, error_message)``.
     """
     resolved = _resolve_import_path(import_path, statute_dir)
@@ -367,7 +393,7 @@ def _find_variable_in_path(
         return False, f"path '{import_path}' does not exist"
 
     if resolved.is_file():
-        exports = _extract_exports(resolved)
+        exports = _cached_exports(resolved, exports_cache)
         if variable in exports:
             return True, ""
         return (
@@ -379,7 +405,7 @@ def _find_variable_in_path(
     if resolved.is_dir():
         all_exports: set[str] = set()
         for rac_file in resolved.rglob("*.rac"):
-            exports = _extract_exports(rac_file)
+            exports = _cached_exports(rac_file, exports_cache)
             if variable in exports:
                 return True, ""
             all_exports.update(exports)
@@ -437,15 +463,23 @@ def _extract_imports(filepath: Path) -> list[tuple[int, str, str]]:
 
 def _build_dependency_graph(
     statute_dir: Path,
+    imports_by_file: dict[Path, list[tuple[int, str, str]]] | None = None,
 ) -> dict[str, list[str]]:
-    """Build a dependency graph for cycle detection."""
+    """Build a dependency graph for cycle detection.
+
+    Uses *imports_by_file* when given instead of re-reading every file.
+    """
     graph: dict[str, list[str]] = defaultdict(list)
 
-    for rac_file in statute_dir.rglob("*.rac"):
+    if imports_by_file is None:
+        imports_by_file = {
+            rac_file: _extract_imports(rac_file) for rac_file in statute_dir.rglob("*.rac")
+        }
+
+    for rac_file, imports in imports_by_file.items():
         rel_path = rac_file.relative_to(statute_dir)
         node = str(rel_path.with_suffix(""))
 
-        imports = _extract_imports(rac_file)
         for _, import_path, _ in imports:
             graph[node].append(import_path)
 
@@ -486,16 +520,21 @@ def _find_cycles(graph: dict[str, list[str]]) -> list[list[str]]:
 # ---------------------------------------------------------------------------
 
 
-def validate_imports(statute_dir: Path) -> list[str]:
+def validate_imports(statute_dir: Path, rac_files: list[Path] | None = None) -> list[str]:
     """Validate that all imports in .rac files resolve and have no cycles.
 
+    *rac_files*, when given, is the already-walked list of files to check.
+
     Returns a list of error strings (empty means success).
     """
     errors: list[str] = []
+    # Each file is read once for its imports and at most once for its exports
+    imports_by_file: dict[Path, list[tuple[int, str, str]]] = {}
+    exports_cache: dict[Path, set[str]] = {}
 
-    for rac_file in sorted(statute_dir.rglob("*.rac")):
+    for rac_file in rac_files if rac_files is not None else _rac_files(statute_dir):
         try:
-            imports = _extract_imports(rac_file)
+            imports = imports_by_file[rac_file] = _extract_imports(rac_file)
         except Exception as exc:
             errors.append(f"{rac_file}: failed to parse imports: {exc}")
             continue
@@ -505,7 +544,7 @@ def validate_imports(statute_dir: Path) -> list[str]:
             if ":" in import_path:
                 continue
             found, error_msg = _find_variable_in_path(
-                import_path, variable, statute_dir
+                import_path, variable, statute_dir, exports_cache
             )
             if not found:
                 errors.append(
@@ -514,7 +553,7 @@ def validate_imports(statute_dir: Path) -> list[str]:
                 )
 
     # Cycle detection
-    graph = _build_dependency_graph(statute_dir)
+    graph = _build_dependency_graph(statute_dir, imports_by_file)
     cycles = _find_cycles(graph)
     for cycle in cycles:
         cycle_str = " -> ".join(cycle)
@@ -533,8 +572,9 @@ def validate_all(statute_dir: Path) -> list[str]:
 
     Returns a list of error strings (empty means success).
     """
-    errors = validate_schema(statute_dir)
-    errors.extend(validate_imports(statute_dir))
+    rac_files = _rac_files(statute_dir)  # walk the tree once for both passes
+    errors = validate_schema(statute_dir, rac_files)
+    errors.extend(validate_imports(statute_dir, rac_files))
     return errors
 
 
@@ -20,6 +20,16 @@ TAX_MODEL_SOURCE = """
         from 2024-01-01: income * gov/rate
 """
 
+
+@pytest.fixture(autouse=True)
+def ir_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep pickled IR from Model.from_source out of the real cache directory."""
+    import rac.model
+
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setattr(rac.model, "CACHE_DIR", cache_dir)
+    return cache_dir
+
 # -- Parser ------------------------------------------------------------------
 
 
@@ -54,6 +64,34 @@ class TestParser:
         """)
         assert len(module.variables[0].values) == 2
 
+    def test_parse_repeated_dates_shared(self):
+        from rac import parse
+
+        module = parse("""
+            variable gov/a:
+                from 2024-01-01: 1
+            variable gov/b:
+                from 2024-01-01: 2
+        """)
+        a, b = (v.values[0].start for v in module.variables)
+        assert a == date(2024, 1, 1)
+        assert a is b
+
+    def test_parse_shares_common_literals(self):
+        from rac import parse
+
+        module = parse("""
+            variable gov/a:
+                from 2024-01-01: if true: 1 else: 5000
+            variable gov/b:
+                from 2024-01-01: if true: 1 else: 5000
+        """)
+        a, b = (v.values[0].expr for v in module.variables)
+        assert a.condition is b.condition
+        assert a.then_expr is b.then_expr
+        assert a.else_expr is not b.else_expr  # large ints get their own node
+        assert a.else_expr == b.else_expr
+
     def test_parse_expressions(self):
         from rac import parse
 
@@ -154,6 +192,20 @@ class TestParser:
         expr = module.variables[0].values[0].expr
         assert expr.type == "match"
 
+    def test_parse_match_wildcard_default(self):
+        from rac import parse
+
+        module = parse("""
+            variable test/match_var:
+                from 2024-01-01:
+                    match status:
+                        "single" => 12000
+                        _ => 24000
+        """)
+        expr = module.variables[0].values[0].expr
+        assert len(expr.cases) == 1
+        assert expr.default.value == 24000
+
     def test_parse_field_access(self):
         from rac import parse
 
@@ -813,6 +865,22 @@ class TestExecutorCoverage:
         result = execute(ir, {})
         assert result.scalars["test/deduction"] == 24000
 
+    def test_execute_match_wildcard_default(self):
+        from rac import compile, execute, parse
+
+        module = parse("""
+            variable test/status:
+                from 2024-01-01: "widowed"
+            variable test/deduction:
+                from 2024-01-01:
+                    match test/status:
+                        "single" => 12000
+                        _ => 18000
+        """)
+        ir = compile([module], as_of=date(2024, 6, 1))
+        result = execute(ir, {})
+        assert result.scalars["test/deduction"] == 18000
+
     def test_execute_field_access(self):
         from rac import compile, execute, parse
 
@@ -1065,6 +1133,15 @@ class TestSchemaCoverage:
         assert data.get_row("person", 1) == {"id": 1, "name": "Alice"}
         assert data.get_row("person", 3) is None
 
+    def test_data_indexes_tables_on_first_lookup(self):
+        from rac.schema import Data
+
+        data = Data(tables={"person": [{"id": 1}, {"name": "no id"}], "household": [{"id": 1}]})
+        assert data._index == {}
+        assert data.get_row("person", 1) == {"id": 1}
+        assert data._index == {"person": {1: {"id": 1}}}
+        assert data.get_row("missing", 1) is None
+
     def test_data_get_related(self):
         from rac.schema import Data
 
@@ -1081,6 +1158,58 @@ class TestSchemaCoverage:
         related = data.get_related("person", "household_id", 1)
         assert len(related) == 2
 
+    def test_data_get_related_indexes_fk_once(self):
+        from rac.schema import Data
+
+        rows = [{"id": i, "household_id": i % 3} for i in range(9)]
+        data = Data(tables={"person": rows})
+        assert data.get_related("person", "household_id", 1) == [rows[1], rows[4], rows[7]]
+        assert ("person", "household_id") in data._fk_index
+
+        # Callers get their own list; the cached group is not affected
+        data.get_related("person", "household_id", 2).clear()
+        assert data.get_related("person", "household_id", 2) == [rows[2], rows[5], rows[8]]
+        assert data.get_related("person", "household_id", 99) == []
+        assert data.get_related("person", "missing_fk", None) == rows
+
+    def test_data_keeps_caller_rows(self):
+        from rac.schema import Data
+
+        rows = [{"id": 1, "income": 10.0}]
+        data = Data(tables={"person": rows})
+        assert data.get_rows("person") is rows
+        assert data.get_row("person", 1) is rows[0]
+        # The primary key index is derived state and does not affect equality
+        data.as_columns("person")
+        assert data == Data(tables={"person": [{"id": 1, "income": 10.0}]})
+
+    def test_entity_defaults_not_shared(self):
+        from rac.schema import Entity, Field
+
+        a, b = Entity(name="a"), Entity(name="b")
+        a.fields["x"] = Field(name="x", dtype="int")
+        assert b.fields == {}
+
+    def test_data_as_columns(self):
+        from rac.schema import MISSING, Data
+
+        data = Data(
+            tables={
+                "person": [
+                    {"id": 1, "income": 100, "age": 30, "name": "Alice"},
+                    {"id": 2, "income": 200.5, "name": "Bob"},
+                ]
+            }
+        )
+        cols = data.as_columns("person")
+        # Cells keep the caller's Python values rather than NumPy scalars
+        assert cols["income"] == [100, 200.5]
+        assert type(cols["income"][0]) is int
+        assert type(cols["id"][1]) is int
+        assert cols["name"][0] == "Alice"
+        assert cols["age"][1] is MISSING
+        assert data.as_columns("person") is cols
+
 
 class TestParserCoverage:
     """Tests for parser branches not covered above."""
@@ -1187,6 +1316,100 @@ class TestParserCoverage:
         tok = parser.peek(100)
         assert tok.type == "EOF"
 
+    def test_binary_operator_precedence(self):
+        from rac import ParseError, parse
+
+        def expr(src):
+            module = parse(f"variable t/v:\n    from 2024-01-01: {src}\n")
+            return module.variables[0].values[0].expr
+
+        def show(e):
+            if e.type == "binop":
+                return f"({show(e.left)} {e.op} {show(e.right)})"
+            return str(e.path if e.type == "var" else e.value)
+
+        assert show(expr("a or b and c < d + e * f")) == "(a or (b and (c < (d + (e * f)))))"
+        assert show(expr("a - b - c / d / e")) == "((a - b) - ((c / d) / e))"
+        assert show(expr("a < b and c >= d or e")) == "(((a < b) and (c >= d)) or e)"
+        with pytest.raises(ParseError):
+            parse("variable t/v:\n    from 2024-01-01: a < b < c\n")
+        with pytest.raises(ParseError):
+            parse("variable t/v:\n    from 2024-01-01: a < b and c < d < e\n")
+
+    def test_unary_prefix_chain(self):
+        from rac import parse
+
+        depth = 5000  # deeper than the default recursion limit
+        module = parse(f"variable t/v:\n    from 2024-01-01: {'- ' * depth}not x\n")
+        expr = module.variables[0].values[0].expr
+        for _ in range(depth):
+            assert expr.op == "-"
+            expr = expr.operand
+        assert expr.op == "not"
+        assert expr.operand.path == "x"
+
+    def test_lexer_positions(self):
+        from rac.parser import Lexer
+
+        tokens = Lexer("a/b # note\n\n  x1 <= 2024-01-01\t's'").tokens
+        assert [(t.type, t.value, t.line, t.col) for t in tokens] == [
+            ("PATH", "a/b", 1, 1),
+            ("IDENT", "x1", 3, 3),
+            ("LE", "<=", 3, 6),
+            ("DATE", "2024-01-01", 3, 9),
+            ("STRING", "'s'", 3, 20),
+            ("EOF", "", 3, 23),
+        ]
+
+    def test_lexer_dispatch_edge_cases(self):
+        from rac.parser import Lexer, ParseError
+
+        def lex(src):
+            return [(t.type, t.value, t.line, t.col) for t in Lexer(src).tokens]
+
+        assert lex("a/1 x_/y 2024-01-015 3.x") == [
+            ("IDENT", "a", 1, 1),
+            ("SLASH", "/", 1, 2),
+            ("INT", "1", 1, 3),
+            ("PATH", "x_/y", 1, 5),
+            ("DATE", "2024-01-01", 1, 10),
+            ("INT", "5", 1, 20),
+            ("INT", "3", 1, 22),
+            ("DOT", ".", 1, 23),
+            ("IDENT", "x", 1, 24),
+            ("EOF", "", 1, 25),
+        ]
+        # Non-ASCII digits and whitespace go through the full pattern table
+        assert lex("\u0663\u00a0'q'# end") == [
+            ("INT", "\u0663", 1, 1),
+            ("STRING", "'q'", 1, 3),
+            ("EOF", "", 1, 6),
+        ]
+        with pytest.raises(ParseError, match="unexpected char: '\"'"):
+            Lexer('x "open')
+
+    def test_lexer_interns_names(self):
+        from rac.parser import Lexer
+
+        first = Lexer("income + gov/rate").tokens
+        second = Lexer("gov/rate * income").tokens
+        assert first[0].value is second[2].value
+        assert first[2].value is second[0].value
+
+    def test_lexer_operator_tables_match_patterns(self):
+        from rac.parser import Lexer
+
+        for table in (Lexer._OPERATORS_2, Lexer._OPERATORS_1):
+            for text, ttype in table.items():
+                m = Lexer._MASTER_RE.fullmatch(text)
+                assert m is not None and Lexer._GROUP_TYPES[m.lastgroup] == ttype
+
+    def test_lexer_rejects_lone_operator_prefix(self):
+        from rac.parser import Lexer, ParseError
+
+        with pytest.raises(ParseError, match="unexpected char: '='"):
+            Lexer("a = b")
+
     def test_consume_mismatch(self):
         from rac.parser import Lexer, ParseError, Parser
 
@@ -1329,6 +1552,108 @@ class TestExecutorCoverage2:
         related = ctx.get_related("person", "household_id")
         assert len(related) == 2
 
+    def test_entity_variable_reads_earlier_entity_variable(self):
+        from rac import compile, execute, parse
+
+        module = parse("""
+            entity person:
+                income: float
+
+            variable person/taxable:
+                entity: person
+                from 2024-01-01: income - 1000
+
+            variable person/tax:
+                entity: person
+                from 2024-01-01: person/taxable * 0.5
+        """)
+        ir = compile([module], as_of=date(2024, 6, 1))
+        result = execute(ir, {"person": [{"id": 1, "income": 3000}, {"id": 2, "income": 5000}]})
+        assert result.entities["person"]["person/tax"] == [1000.0, 2000.0]
+
+    def test_entity_variable_int_does_not_overflow(self):
+        from rac import compile, execute, parse
+
+        module = parse("""
+            entity person:
+                age: int
+
+            variable person/big:
+                entity: person
+                from 2024-01-01: age * 4611686018427387904
+        """)
+        ir = compile([module], as_of=date(2024, 6, 1))
+        result = execute(ir, {"person": [{"id": 1, "age": 4}]})
+        assert result.entities["person"]["person/big"] == [4 * 4611686018427387904]
+
+    def test_entity_variable_keeps_bool_fields(self):
+        from rac import compile, execute, parse
+
+        module = parse("""
+            entity person:
+                flag: int
+
+            variable person/same:
+                entity: person
+                from 2024-01-01: flag
+        """)
+        ir = compile([module], as_of=date(2024, 6, 1))
+        result = execute(ir, {"person": [{"id": 1, "flag": True}, {"id": 2, "flag": 3}]})
+        values = result.entities["person"]["person/same"]
+        assert values == [True, 3]
+        assert values[0] is True
+
+    def test_entity_variable_results_are_python_values(self):
+        from rac import compile, execute, parse
+
+        module = parse("""
+            entity person:
+                age: int
+                income: float
+                employed: bool
+
+            variable person/age_next:
+                entity: person
+                from 2024-01-01: age + 1
+
+            variable person/net:
+                entity: person
+                from 2024-01-01: income * 0.5
+
+            variable person/working:
+                entity: person
+                from 2024-01-01: employed
+        """)
+        ir = compile([module], as_of=date(2024, 6, 1))
+        result = execute(
+            ir, {"person": [{"id": 1, "age": 30, "income": 1000.0, "employed": False}]}
+        )
+        person = result.entities["person"]
+        assert type(person["person/age_next"][0]) is int
+        assert type(person["person/net"][0]) is float
+        assert person["person/working"][0] is False
+
+    def test_entity_variable_missing_field_raises(self):
+        from rac import compile, execute, parse
+        from rac.executor import ExecutionError
+
+        module = parse("""
+            variable person/double:
+                entity: person
+                from 2024-01-01: income * 2
+        """)
+        ir = compile([module], as_of=date(2024, 6, 1))
+        with pytest.raises(ExecutionError, match="undefined: income"):
+            execute(ir, {"person": [{"id": 1, "income": 1}, {"id": 2}]})
+
+    def test_get_related_from_columns(self):
+        from rac.executor import Context
+        from rac.schema import Data
+
+        data = Data(tables={"person": [{"id": 1, "household_id": 10}]})
+        ctx = Context(data=data, current_columns={"id": [10]})
+        assert len(ctx.get_related("person", "household_id")) == 1
+
     def test_get_related_no_current_row_raises(self):
         from rac.executor import Context, ExecutionError
         from rac.schema import Data
@@ -1730,10 +2055,10 @@ class TestNativeCoverage:
             with pytest.raises(RuntimeError, match="Compilation failed"):
                 compile_to_binary(ir, cache=False)
 
-    def test_generate_main_called(self):
-        """_generate_main produces valid Rust main function."""
+    def test_generate_ffi_called(self):
+        """_generate_ffi produces the exported rac_run entry point."""
         from rac import compile, parse
-        from rac.native import _generate_main
+        from rac.native import _generate_ffi
 
         module = parse("""
             entity person:
@@ -1751,15 +2076,15 @@ class TestNativeCoverage:
         entity_schemas = {"person": ["income", "age"]}
         entity_outputs = {"person": ["person/tax"]}
 
-        main_code = _generate_main(ir, entity_schemas, entity_outputs)
-        assert "fn main()" in main_code
-        assert '"person"' in main_code
-        assert "as i64" in main_code  # age is int
+        ffi_code = _generate_ffi(ir, entity_schemas, entity_outputs)
+        assert 'extern "C" fn rac_run(' in ffi_code
+        assert "// person\n            0 => {" in ffi_code
+        assert "as i64" in ffi_code  # age is int
 
-    def test_generate_main_empty_outputs(self):
-        """_generate_main skips entity with no outputs (L216-217)."""
+    def test_generate_ffi_empty_outputs(self):
+        """_generate_ffi skips entity with no outputs."""
         from rac import compile, parse
-        from rac.native import _generate_main
+        from rac.native import _generate_ffi
 
         module = parse("""
             entity person:
@@ -1767,13 +2092,29 @@ class TestNativeCoverage:
         """)
         ir = compile([module], as_of=date(2024, 6, 1))
         # entity_schemas has person, but entity_outputs has empty list
-        main_code = _generate_main(ir, {"person": ["income"]}, {"person": []})
-        assert "fn main()" in main_code
+        ffi_code = _generate_ffi(ir, {"person": ["income"]}, {"person": []})
+        assert 'extern "C" fn rac_run(' in ffi_code
         # Should not contain person handler since outputs is empty
-        assert '"person"' not in main_code
+        assert "// person" not in ffi_code
+
+    def test_generate_ffi_entity_without_inputs(self):
+        """Entities with no input fields get an empty column array."""
+        from rac import compile, parse
+        from rac.native import _generate_ffi
+
+        module = parse("""
+            variable person/one:
+                entity: person
+                from 2024-01-01: 1
+        """)
+        ir = compile([module], as_of=date(2024, 6, 1))
+        ffi_code = _generate_ffi(ir, {"person": []}, {"person": ["person/one"]})
+        assert "const PERSON_INPUTS: usize = 0;" in ffi_code
+        assert "const PERSON_OUTPUTS: usize = 1;" in ffi_code
+        assert "run_blocks::<PERSON_INPUTS, PERSON_OUTPUTS, _>(" in ffi_code
 
     def test_compile_to_binary_no_cache(self):
-        """Force a fresh build (no cache) to cover lines 169-204 + _generate_main."""
+        """Force a fresh build (no cache) to cover the build path + _generate_ffi."""
         from rac import compile, compile_to_binary, parse
 
         module = parse(TAX_MODEL_SOURCE)
@@ -1871,9 +2212,9 @@ class TestNativeNoRust:
                 _install_rust()
 
     def test_binary_run_error(self):
-        """Binary returning non-zero exit code raises RuntimeError."""
+        """Native call returning a non-zero status raises RuntimeError."""
         from pathlib import Path
-        from unittest.mock import MagicMock, patch
+        from unittest.mock import MagicMock
 
         from rac.compiler import IR
         from rac.native import CompiledBinary
@@ -1886,14 +2227,210 @@ class TestNativeNoRust:
             entity_outputs={"person": ["person/tax"]},
         )
 
-        mock_result = MagicMock()
-        mock_result.returncode = 1
-        mock_result.stderr = "some error"
+        # Stand in for the loaded library so no shared object is needed
+        binary._lib = MagicMock()
+        binary._lib.rac_run.return_value = 2
+
+        with pytest.raises(RuntimeError, match="Binary failed for person: unknown entity"):
+            binary.run({"person": [{"id": 1, "income": 50000.0}]})
+
+    def test_binary_run_multiple_entities(self):
+        import ctypes
+        from pathlib import Path
+        from unittest.mock import MagicMock
+
+        import numpy as np
+
+        from rac.compiler import IR
+        from rac.native import CompiledBinary
+        from rac.schema import Schema
+
+        binary = CompiledBinary(
+            binary_path=Path("/fake/binary"),
+            ir=IR(schema_=Schema(), variables={}, order=[]),
+            entity_schemas={"person": ["income"], "household": ["size"]},
+            entity_outputs={"person": ["person/tax"], "household": ["household/a"]},
+        )
+
+        def fake_run(entity_id, n_rows, ptr, row_stride, col_stride, out_ptr):
+            out = np.ctypeslib.as_array((ctypes.c_double * n_rows).from_address(out_ptr))
+            out[:] = entity_id + 1
+            return 0
+
+        binary._lib = MagicMock()
+        binary._lib.rac_run.side_effect = fake_run
+        results = binary.run(
+            {
+                "household": np.zeros((2, 1)),
+                "firm": np.zeros((1, 1)),
+                "person": [{"income": 1.0}, {"income": 2.0}, {"income": 3.0}],
+            }
+        )
+
+        assert list(results) == ["household", "person"]
+        assert results["person"].tolist() == [[1.0], [1.0], [1.0]]
+        assert results["household"].tolist() == [[2.0], [2.0]]
+
+        binary._lib.rac_run.side_effect = None
+        binary._lib.rac_run.return_value = 3
+        with pytest.raises(RuntimeError, match="panic in native code"):
+            binary.run({"person": np.zeros((1, 1)), "household": np.zeros((1, 1))})
+
+    def test_binary_run_passes_entity_id(self):
+        from pathlib import Path
+        from unittest.mock import MagicMock
+
+        from rac.compiler import IR
+        from rac.native import CompiledBinary
+        from rac.schema import Schema
+
+        binary = CompiledBinary(
+            binary_path=Path("/fake/binary"),
+            ir=IR(schema_=Schema(), variables={}, order=[]),
+            entity_schemas={"tax_unit": [], "household": ["size"], "person": ["income"]},
+            entity_outputs={"household": ["household/a"], "person": ["person/tax"]},
+        )
+        assert binary._entity_ids == {"household": 0, "person": 1}
 
-        # Only mock subprocess.run, let real file I/O happen
-        with patch("subprocess.run", return_value=mock_result):
-            with pytest.raises(RuntimeError, match="Binary failed"):
-                binary.run({"person": [{"id": 1, "income": 50000.0}]})
+        binary._lib = MagicMock()
+        binary._lib.rac_run.return_value = 0
+        binary.run({"person": [{"income": 1.0}]})
+        assert binary._lib.rac_run.call_args.args[0] == 1
+
+    def test_target_cpu_config(self, tmp_path, monkeypatch):
+        from unittest.mock import MagicMock
+
+        import rac.native
+        from rac import compile, parse
+        from rac.native import _ir_hash, compile_to_binary
+
+        ir = compile(
+            [
+                parse("""
+                    entity person:
+                        income: float
+                    variable person/tax:
+                        entity: person
+                        from 2024-01-01: income * 0.2
+                """)
+            ],
+            as_of=date(2024, 6, 1),
+        )
+        monkeypatch.setattr(rac.native, "CACHE_DIR", tmp_path)
+        monkeypatch.setattr(rac.native, "ensure_cargo", MagicMock(return_value="cargo"))
+        build = MagicMock(return_value=MagicMock(returncode=0))
+        monkeypatch.setattr(rac.native.subprocess, "run", build)
+
+        monkeypatch.delenv("RAC_NATIVE_CPU", raising=False)
+        native = compile_to_binary(ir)
+        config = native.binary_path.parents[2] / ".cargo" / "config.toml"
+        assert 'rustflags = ["-C", "target-cpu=native"]' in config.read_text()
+        native_hash = _ir_hash(ir)
+
+        monkeypatch.setenv("RAC_NATIVE_CPU", "generic")
+        portable = compile_to_binary(ir)
+        assert _ir_hash(ir) != native_hash
+        assert not (portable.binary_path.parents[2] / ".cargo").exists()
+
+    def test_rows_to_array(self):
+        from rac.native import _rows_to_array
+
+        arr = _rows_to_array([{"a": 1, "b": 2.5}, {"b": True}], ["a", "b"])
+        assert arr.dtype.name == "float64"
+        assert arr.flags.f_contiguous
+        assert arr.tolist() == [[1.0, 2.5], [0.0, 1.0]]
+
+    def test_binary_run_passes_float64_arrays_without_copy(self):
+        from pathlib import Path
+        from unittest.mock import MagicMock
+
+        import numpy as np
+
+        from rac.compiler import IR
+        from rac.native import CompiledBinary
+        from rac.schema import Schema
+
+        binary = CompiledBinary(
+            binary_path=Path("/fake/binary"),
+            ir=IR(schema_=Schema(), variables={}, order=[]),
+            entity_schemas={"person": ["income", "age"]},
+            entity_outputs={"person": ["person/tax"]},
+        )
+        binary._lib = MagicMock()
+        binary._lib.rac_run.return_value = 0
+
+        arr = np.zeros((3, 2))
+        binary.run({"person": arr})
+        _, n_rows, ptr, row_stride, col_stride, _ = binary._lib.rac_run.call_args.args
+        assert (n_rows, ptr, row_stride, col_stride) == (3, arr.ctypes.data, 2, 1)
+
+        farr = np.asfortranarray(arr)
+        binary.run({"person": farr})
+        _, _, ptr, row_stride, col_stride, _ = binary._lib.rac_run.call_args.args
+        assert (ptr, row_stride, col_stride) == (farr.ctypes.data, 1, 3)
+
+    def test_binary_run_warns_when_copying_input(self):
+        import warnings
+        from pathlib import Path
+        from unittest.mock import MagicMock
+
+        import numpy as np
+
+        from rac.compiler import IR
+        from rac.native import CompiledBinary
+        from rac.schema import Schema
+
+        binary = CompiledBinary(
+            binary_path=Path("/fake/binary"),
+            ir=IR(schema_=Schema(), variables={}, order=[]),
+            entity_schemas={"person": ["income", "age"]},
+            entity_outputs={"person": ["person/tax"]},
+        )
+        binary._lib = MagicMock()
+        binary._lib.rac_run.return_value = 0
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            binary.run({"person": np.zeros((3, 2))})
+            binary.run({"person": np.zeros((2, 3)).T})
+
+        arr = np.zeros((3, 2), dtype=np.float32)
+        with pytest.warns(RuntimeWarning, match="got float32"):
+            binary.run({"person": arr})
+        _, _, ptr, row_stride, col_stride, _ = binary._lib.rac_run.call_args.args
+        assert ptr != arr.ctypes.data
+        assert (row_stride, col_stride) == (2, 1)
+
+        with pytest.warns(RuntimeWarning, match="strides"):
+            binary.run({"person": np.zeros((3, 2))[::-1]})
+
+        # float64 with 8-byte strides, but the buffer starts one byte in
+        unaligned = np.frombuffer(bytearray(49), dtype=np.float64, offset=1).reshape(3, 2)
+        assert not unaligned.flags.aligned
+        with pytest.warns(RuntimeWarning, match="aligned float64"):
+            binary.run({"person": unaligned})
+        _, _, ptr, _, _, _ = binary._lib.rac_run.call_args.args
+        assert ptr != unaligned.ctypes.data
+        assert ptr % 8 == 0
+
+    def test_binary_run_rejects_wrong_column_count(self):
+        from pathlib import Path
+
+        import numpy as np
+
+        from rac.compiler import IR
+        from rac.native import CompiledBinary
+        from rac.schema import Schema
+
+        binary = CompiledBinary(
+            binary_path=Path("/fake/binary"),
+            ir=IR(schema_=Schema(), variables={}, order=[]),
+            entity_schemas={"person": ["income"]},
+            entity_outputs={"person": ["person/tax"]},
+        )
+
+        with pytest.raises(ValueError, match="Expected 1 input columns for person"):
+            binary.run({"person": np.zeros((2, 3))})
 
 
 # -- Model API coverage ---------------------------------------------------
@@ -2042,6 +2579,330 @@ class TestModelCoverage:
         assert "by_decile" in summary
 
 
+class TestModelNoRust:
+    """Cover model.py result types and compare planning without a Rust toolchain."""
+
+    def test_run_result_rows_and_columns(self):
+        import numpy as np
+
+        from rac.model import RunResult
+
+        arr = np.array([[1.0, 2.0], [3.0, 4.0]])
+        result = RunResult({"person": arr}, {"person": ["person/a", "person/b"]})
+        assert result.to_dict("person") == [
+            {"person/a": 1.0, "person/b": 2.0},
+            {"person/a": 3.0, "person/b": 4.0},
+        ]
+        columns = result.to_columns("person")
+        assert list(columns) == ["person/a", "person/b"]
+        assert columns["person/b"].tolist() == [2.0, 4.0]
+        assert np.shares_memory(columns["person/a"], arr)
+
+    def test_gain_uses_name_maps_and_caches(self):
+        from dataclasses import fields
+
+        import numpy as np
+
+        from rac.model import CompareResult, RunResult
+
+        baseline = RunResult(
+            {"person": np.array([[1.0, 10.0]])}, {"person": ["person/a", "person/b"]}
+        )
+        reform = RunResult(
+            {"person": np.array([[12.0, 2.0]])}, {"person": ["person/b", "person/a"]}
+        )
+        comparison = CompareResult(baseline, reform, {"person": 1})
+        gain = comparison.gain("person", "person/b")
+        assert gain.tolist() == [2.0]
+        assert comparison.gain("person", "person/b") is gain
+        assert not gain.flags.writeable
+        assert comparison.gain("person", "person/a").tolist() == [1.0]
+        with pytest.raises(KeyError):
+            comparison.gain("person", "person/missing")
+
+        # Caches are declared fields, but stay out of repr and equality
+        names = {f.name for f in fields(comparison)}
+        assert {"_b_idx", "_r_idx", "_gain_cache", "_decile_cache"} <= names
+        assert "_gain_cache" not in repr(comparison)
+        assert comparison == CompareResult(baseline, reform, {"person": 1})
+
+    def test_summary_empty_entity(self):
+        import math
+
+        import numpy as np
+
+        from rac.model import CompareResult, RunResult
+
+        result = RunResult({"person": np.zeros((0, 1))}, {"person": ["person/tax"]})
+        summary = CompareResult(result, result, {"person": 0}).summary("person", "person/tax")
+        assert summary["n"] == 0
+        assert summary["winners"] == summary["losers"] == 0
+        assert summary["total_annual"] == 0.0
+        assert math.isnan(summary["mean_monthly"])
+        assert math.isnan(summary["winners_pct"])
+        assert math.isnan(summary["losers_pct"])
+
+    def test_summary_by_decile_values(self):
+        import numpy as np
+
+        from rac.model import CompareResult, RunResult
+
+        income = np.arange(1.0, 101.0)
+        gain = np.where(income > 50, 5.0, -5.0)
+        baseline = RunResult({"person": np.zeros((100, 1))}, {"person": ["person/tax"]})
+        reform = RunResult({"person": gain[:, None]}, {"person": ["person/tax"]})
+        summary = CompareResult(baseline, reform, {"person": 100}).summary(
+            "person", "person/tax", income_col=income
+        )
+
+        assert summary["winners"] == 50
+        assert summary["losers"] == 50
+        deciles = summary["by_decile"]
+        assert [d["decile"] for d in deciles] == list(range(1, 11))
+        assert deciles[0] == {
+            "decile": 1,
+            "avg_income": 5.5,
+            "avg_gain": -5.0,
+            "pct_winners": 0.0,
+        }
+        assert deciles[5] == {
+            "decile": 6,
+            "avg_income": 55.5,
+            "avg_gain": 5.0,
+            "pct_winners": 100.0,
+        }
+        # The maximum income lands in the top decile rather than being dropped
+        assert deciles[9] == {
+            "decile": 10,
+            "avg_income": 95.5,
+            "avg_gain": 5.0,
+            "pct_winners": 100.0,
+        }
+        assert sum(d["avg_income"] * 10 for d in deciles) == income.sum()
+
+    def test_summary_reuses_decile_index(self):
+        import numpy as np
+
+        from rac import DecileIndex
+        from rac.model import CompareResult, RunResult
+
+        result = RunResult({"person": np.zeros((4, 1))}, {"person": ["person/tax"]})
+        comparison = CompareResult(result, result, {"person": 4})
+        income = np.array([4.0, 3.0, 2.0, 1.0])
+        index = comparison.decile_index(income)
+        assert isinstance(index, DecileIndex)
+        assert comparison.decile_index(income) is index
+        assert comparison.decile_index(income.copy()) is not index
+        assert index.buckets.max() == 9
+        assert index.counts.sum() == 4
+
+        by_array = comparison.summary("person", "person/tax", income_col=income)
+        by_index = comparison.summary("person", "person/tax", income_col=index)
+        assert by_array == by_index
+
+    @pytest.fixture
+    def build_model(self):
+        """Build a two-entity Model at a given rate without compiling Rust."""
+        from pathlib import Path
+
+        from rac.compiler import Compiler
+        from rac.model import Model
+        from rac.native import CompiledBinary
+        from rac.parser import parse
+
+        source = """
+            entity person:
+                income: float
+
+            entity household:
+                size: float
+
+            variable gov/rate:
+                from 2024-01-01: {rate}
+
+            variable person/tax:
+                entity: person
+                from 2024-01-01: income * gov/rate
+
+            variable household/share:
+                entity: household
+                from 2024-01-01: size * 2
+        """
+
+        def build(rate):
+            ir = Compiler([parse(source.format(rate=rate))]).compile(date(2024, 6, 1))
+            binary = CompiledBinary(
+                Path("unused"),
+                ir,
+                {"person": ["income"], "household": ["size"]},
+                {"person": ["person/tax"], "household": ["household/share"]},
+            )
+            return Model(ir, binary)
+
+        return build
+
+    def test_from_source_caches_ir(self, tmp_path, monkeypatch):
+        from unittest.mock import MagicMock
+
+        import rac.model
+        from rac.model import Model
+
+        monkeypatch.setattr(rac.model, "CACHE_DIR", tmp_path)
+        monkeypatch.setattr(rac.model, "compile_to_binary", MagicMock())
+
+        first = Model.from_source(TAX_MODEL_SOURCE, as_of=date(2024, 6, 1))
+        assert len(list((tmp_path / "ir").glob("*.pkl"))) == 1
+
+        monkeypatch.setattr(rac.model, "parse", MagicMock(side_effect=AssertionError))
+        second = Model.from_source(TAX_MODEL_SOURCE, as_of=date(2024, 6, 1))
+        assert second._ir == first._ir
+
+        # A different date is a different cache entry
+        with pytest.raises(AssertionError):
+            Model.from_source(TAX_MODEL_SOURCE, as_of=date(2025, 6, 1))
+
+    def test_ir_cache_tag_tracks_runtime_versions(self, monkeypatch):
+        import sys
+
+        import pydantic
+
+        from rac.model import _ir_cache_tag
+
+        tag = _ir_cache_tag()
+        monkeypatch.setattr(pydantic, "VERSION", "0.0.0")
+        new_pydantic = _ir_cache_tag()
+        assert new_pydantic != tag
+        monkeypatch.setattr(sys, "version", "0.0.0")
+        assert _ir_cache_tag() != new_pydantic
+
+    @pytest.mark.parametrize("entry", [b"not a pickle", b""])
+    def test_from_source_recompiles_unreadable_cache(self, tmp_path, monkeypatch, entry):
+        from unittest.mock import MagicMock
+
+        import rac.model
+        from rac.model import Model
+
+        monkeypatch.setattr(rac.model, "CACHE_DIR", tmp_path)
+        monkeypatch.setattr(rac.model, "compile_to_binary", MagicMock())
+
+        Model.from_source(TAX_MODEL_SOURCE, as_of=date(2024, 6, 1))
+        (cached,) = (tmp_path / "ir").glob("*.pkl")
+        cached.write_bytes(entry)
+
+        model = Model.from_source(TAX_MODEL_SOURCE, as_of=date(2024, 6, 1))
+        assert "person/tax" in model._ir.variables
+
+    def test_from_source_cache_read_errors_propagate(self, monkeypatch):
+        from unittest.mock import MagicMock
+
+        import rac.model
+        from rac.model import Model
+
+        monkeypatch.setattr(rac.model, "compile_to_binary", MagicMock())
+        Model.from_source(TAX_MODEL_SOURCE, as_of=date(2024, 6, 1))
+
+        # Only unreadable entries are recompiled; other failures are real bugs
+        monkeypatch.setattr(rac.model.pickle, "load", MagicMock(side_effect=RuntimeError("bug")))
+        with pytest.raises(RuntimeError, match="bug"):
+            Model.from_source(TAX_MODEL_SOURCE, as_of=date(2024, 6, 1))
+
+    def test_scalars_evaluated_once(self, build_model):
+        from unittest.mock import patch
+
+        from rac.executor import evaluate
+
+        model = build_model(0.2)
+        with patch("rac.model.evaluate", wraps=evaluate) as spy:
+            assert model.scalars == {"gov/rate": 0.2}
+            assert model.scalars["gov/rate"] == 0.2
+        assert spy.call_count == 1
+
+    def test_compare_reruns_only_changed_entities(self, build_model):
+        from unittest.mock import MagicMock
+
+        import numpy as np
+
+        from rac.model import RunResult
+
+        baseline, reform = build_model(0.2), build_model(0.25)
+        assert baseline._changed_entities(build_model(0.2)) == set()
+        assert baseline._changed_entities(reform) == {"person"}
+
+        data = {"person": np.ones((3, 1)), "household": np.ones((2, 1))}
+        baseline.run = MagicMock(
+            return_value=RunResult(
+                {"person": np.zeros((3, 1)), "household": np.full((2, 1), 2.0)},
+                {"person": ["person/tax"], "household": ["household/share"]},
+            )
+        )
+        reform.run = MagicMock(
+            return_value=RunResult({"person": np.ones((3, 1))}, {"person": ["person/tax"]})
+        )
+        comparison = baseline.compare(reform, data)
+
+        assert list(reform.run.call_args.args[0]) == ["person"]
+        assert comparison.gain("person", "person/tax").tolist() == [1.0, 1.0, 1.0]
+        assert comparison.gain("household", "household/share").tolist() == [0.0, 0.0]
+
+    def test_model_gain(self, build_model):
+        from unittest.mock import MagicMock
+
+        import numpy as np
+
+        baseline, reform = build_model(0.2), build_model(0.25)
+        baseline._binary.run = MagicMock(return_value={"person": np.full((3, 1), 2.0)})
+        reform_out = np.full((3, 1), 5.0)
+        reform._binary.run = MagicMock(return_value={"person": reform_out})
+
+        data = {"person": np.ones((3, 1)), "household": np.ones((2, 1)), "firm": np.ones((1, 1))}
+        gains = baseline.gain(reform, data)
+
+        assert set(gains.arrays) == {"person", "household"}
+        assert gains.to_columns("person")["person/tax"].tolist() == [3.0, 3.0, 3.0]
+        # The difference is written into the reform buffer rather than a new array
+        assert gains["person"] is reform_out
+        # Household formulas are identical, so neither model runs it
+        assert gains.to_dict("household") == [{"household/share": 0.0}] * 2
+        assert list(reform._binary.run.call_args.args[0]) == ["person"]
+
+    def test_model_gain_entity_only_in_reform(self, build_model):
+        from unittest.mock import MagicMock
+
+        import numpy as np
+
+        baseline, reform = build_model(0.2), build_model(0.25)
+        reform._binary.entity_outputs["firm"] = ["firm/profit"]
+        baseline._binary.run = MagicMock(return_value={"person": np.full((3, 1), 2.0)})
+        reform._binary.run = MagicMock(return_value={"person": np.full((3, 1), 5.0)})
+
+        data = {"person": np.ones((3, 1)), "firm": np.ones((2, 1))}
+        gains = baseline.gain(reform, data)
+
+        assert gains.output_names["firm"] == []
+        assert gains["firm"].shape == (2, 0)
+        assert gains["person"].tolist() == [[3.0]] * 3
+        # Only person is run; the baseline has no firm outputs to compare
+        for mock in (baseline._binary.run, reform._binary.run):
+            assert [list(call.args[0]) for call in mock.call_args_list] == [["person"]]
+
+    def test_model_gain_aligns_outputs_by_name(self, build_model):
+        from unittest.mock import MagicMock
+
+        import numpy as np
+
+        baseline, reform = build_model(0.2), build_model(0.25)
+        reform._binary.entity_outputs["person"] = ["person/extra", "person/tax"]
+        baseline._binary.run = MagicMock(return_value={"person": np.array([[1.0], [2.0]])})
+        reform._binary.run = MagicMock(
+            return_value={"person": np.array([[9.0, 4.0], [9.0, 8.0]])}
+        )
+
+        gains = baseline.gain(reform, {"person": np.ones((2, 1))})
+
+        assert gains.output_names["person"] == ["person/tax"]
+        assert gains["person"].tolist() == [[3.0], [6.0]]
+
+
 # -- Validate coverage -----------------------------------------------------
 
 
@@ -2284,6 +3145,33 @@ formula: |
         errors = validate_imports(tmp_path)
         assert any("Circular dependency" in e for e in errors)
 
+    def test_validate_imports_reads_each_file_once(self, tmp_path, monkeypatch):
+        import rac.validate
+        from rac.validate import validate_imports
+
+        (tmp_path / "base.rac").write_text("variable x:\n    label: x\n")
+        for name in ("a", "b", "c"):
+            (tmp_path / f"{name}.rac").write_text("imports: [base#x]\n")
+
+        calls = []
+
+        def counting(helper):
+            real = getattr(rac.validate, helper)
+
+            def wrapper(path):
+                calls.append((helper, path.name))
+                return real(path)
+
+            monkeypatch.setattr(rac.validate, helper, wrapper)
+
+        counting("_extract_imports")
+        counting("_extract_exports")
+        assert validate_imports(tmp_path) == []
+        assert sorted(calls) == sorted(
+            [("_extract_imports", f"{n}.rac") for n in ("a", "b", "c", "base")]
+            + [("_extract_exports", "base.rac")]
+        )
+
     def test_validate_imports_directory_import(self, tmp_path):
         from rac.validate import validate_imports
 
@@ -2327,6 +3215,20 @@ formula: |
         errors = validate_all(tmp_path)
         assert errors == []
 
+    def test_validate_all_walks_tree_once(self, tmp_path, monkeypatch):
+        import rac.validate
+        from rac.validate import validate_all
+
+        (tmp_path / "a.rac").write_text("imports: [b#y]\nentity: BadEntity\n")
+        (tmp_path / "b.rac").write_text("variable y:\n    label: y\n")
+        walks = []
+        real = rac.validate._rac_files
+        monkeypatch.setattr(rac.validate, "_rac_files", lambda d: walks.append(d) or real(d))
+        errors = validate_all(tmp_path)
+        assert walks == [tmp_path]
+        assert len(errors) == 1
+        assert "invalid entity 'BadEntity'" in errors[0]
+
     def test_extract_exports_bare_def(self, tmp_path):
         from rac.validate import _extract_exports
 
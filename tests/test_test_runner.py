@@ -1,5 +1,6 @@
 """Tests for the .rac.test runner."""
 
+import os
 from datetime import date
 
 import pytest
@@ -160,6 +161,28 @@ gov/rate:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(autouse=True)
+def tests_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep the parsed-test cache out of the real cache directory."""
+    from rac import test_runner
+
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setattr(test_runner, "CACHE_DIR", cache_dir)
+    monkeypatch.delenv("RAC_TEST_NOCACHE", raising=False)
+    return cache_dir
+
+
+def rewrite(path, text):
+    """Replace a file's contents and move its mtime on by a second.
+
+    Cache invalidation tests must not depend on the filesystem's mtime
+    resolution to tell two same-size writes apart.
+    """
+    mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
 @pytest.fixture
 def simple_pair(tmp_path):
     """Create a simple .rac / .rac.test pair."""
@@ -215,6 +238,13 @@ class TestParsePeriod:
     def test_full_date(self):
         assert _parse_period("2024-06-15") == date(2024, 6, 15)
 
+    def test_unpadded_month(self):
+        assert _parse_period("2024-3") == date(2024, 3, 1)
+
+    def test_invalid_month(self):
+        with pytest.raises(ValueError):
+            _parse_period("2024-13")
+
 
 # ---------------------------------------------------------------------------
 # Tests: _values_equal
@@ -370,6 +400,85 @@ class TestLoadTests:
         assert cases[0].variable == "eitc_credit"
         assert cases[0].inputs["earned_income"] == 5000
 
+    def test_load_with_pure_python_loader(self, tmp_path, monkeypatch):
+        import yaml
+
+        from rac import test_runner
+
+        test_file = tmp_path / "test.rac.test"
+        test_file.write_text(SIMPLE_TEST)
+        fast = load_tests(test_file)
+        monkeypatch.setattr(test_runner, "_YAML_LOADER", yaml.SafeLoader)
+        assert load_tests(test_file) == fast
+
+    def test_load_uses_json_cache(self, tmp_path, tests_cache_dir, monkeypatch):
+        from rac import test_runner
+
+        test_file = tmp_path / "test.rac.test"
+        test_file.write_text(SIMPLE_TEST)
+        cases = load_tests(test_file)
+        assert len(list((tests_cache_dir / "tests").glob("*.json"))) == 1
+
+        def no_yaml(path):
+            raise AssertionError("YAML parsed despite a fresh cache entry")
+
+        monkeypatch.setattr(test_runner, "_parse_tests", no_yaml)
+        assert load_tests(test_file) == cases
+
+        # Any change to the file misses the cache
+        test_file.write_text(SIMPLE_TEST + "\n")
+        with pytest.raises(AssertionError, match="despite"):
+            load_tests(test_file)
+
+    @pytest.mark.parametrize(
+        "entry",
+        [
+            '[["test", "my_var", "2024-01-01", {}]]',  # old row layout
+            '[["test", "my_var", "not a date", {}, 0]]',
+            '[["test", "my_var", 20240101, {}, 0]]',
+            '{"rows": []}',
+            '[["test", "my_var", "2024-01',  # truncated
+        ],
+    )
+    def test_load_reparses_bad_cache_entry(self, tmp_path, entry):
+        from rac import test_runner
+
+        test_file = tmp_path / "test.rac.test"
+        test_file.write_text(SIMPLE_TEST)
+        cases = load_tests(test_file)
+        test_runner._tests_cache_path(test_file).write_text(entry)
+        assert load_tests(test_file) == cases
+
+    @pytest.mark.parametrize("name", ["_TESTS_CACHE_VERSION", "__version__"])
+    def test_load_cache_keyed_on_code_version(self, tmp_path, monkeypatch, name):
+        from rac import test_runner
+
+        test_file = tmp_path / "test.rac.test"
+        test_file.write_text(SIMPLE_TEST)
+        current = test_runner._tests_cache_path(test_file)
+        monkeypatch.setattr(test_runner, name, "changed")
+        assert test_runner._tests_cache_path(test_file) != current
+
+    def test_load_cache_bypassed(self, tmp_path, tests_cache_dir, monkeypatch):
+        monkeypatch.setenv("RAC_TEST_NOCACHE", "1")
+        test_file = tmp_path / "test.rac.test"
+        test_file.write_text(SIMPLE_TEST)
+        load_tests(test_file)
+        assert not (tests_cache_dir / "tests").exists()
+
+    def test_load_skips_cache_for_non_json_values(self, tmp_path, tests_cache_dir):
+        test_file = tmp_path / "dates.rac.test"
+        test_file.write_text(
+            "my_var:\n"
+            "  - name: test\n"
+            "    period: 2024-01\n"
+            "    inputs: {start: 2024-03-01}\n"
+            "    expect: 0\n"
+        )
+        assert load_tests(test_file)[0].inputs == {"start": date(2024, 3, 1)}
+        assert not list((tests_cache_dir / "tests").glob("*.json"))
+        assert load_tests(test_file)[0].inputs == {"start": date(2024, 3, 1)}
+
 
 # ---------------------------------------------------------------------------
 # Tests: run_tests
@@ -385,6 +494,133 @@ class TestRunTests:
         assert results.passed == 5
         assert results.failed == 0
 
+    def test_input_free_variables_evaluated_once(self, simple_pair, monkeypatch):
+        from rac import test_runner
+
+        evaluated = []
+        real_evaluate = test_runner.evaluate
+
+        def counting_evaluate(expr, ctx):
+            evaluated.append(expr)
+            return real_evaluate(expr, ctx)
+
+        monkeypatch.setattr(test_runner, "evaluate", counting_evaluate)
+        results = run_tests(*simple_pair)
+        assert results.all_passed
+        # rate and threshold once each for their own cases, once each for the
+        # three gov/tax cases together, then gov/tax itself per case
+        assert len(evaluated) == 2 + 2 + 3
+
+    def test_inputs_override_shared_values(self, tmp_path):
+        rac_file = tmp_path / "tax.rac"
+        test_file = tmp_path / "tax.rac.test"
+        rac_file.write_text(SIMPLE_RAC)
+        test_file.write_text(
+            "gov/tax:\n"
+            "  - name: default rate\n"
+            "    period: 2024-01\n"
+            "    inputs: {income: 30000}\n"
+            "    expect: 4000\n"
+            "  - name: overridden rate\n"
+            "    period: 2024-01\n"
+            "    inputs: {income: 30000, gov/rate: 0.5}\n"
+            "    expect: 10000\n"
+            "  - name: default rate again\n"
+            "    period: 2024-01\n"
+            "    inputs: {income: 20000}\n"
+            "    expect: 2000\n"
+        )
+        results = run_tests(rac_file, test_file)
+        assert [r.actual for r in results.results] == [4000, 10000, 2000]
+
+    def test_shared_value_error_reported_per_case(self, tmp_path):
+        rac_file = tmp_path / "bad.rac"
+        test_file = tmp_path / "bad.rac.test"
+        rac_file.write_text(
+            "variable gov/bad:\n"
+            "    from 2024-01-01: missing + 1\n"
+            "variable gov/out:\n"
+            "    from 2024-01-01: gov/bad + x\n"
+        )
+        test_file.write_text(
+            "gov/out:\n"
+            "  - {name: one, period: 2024-01, inputs: {x: 1}, expect: 0}\n"
+            "  - {name: two, period: 2024-01, inputs: {x: 2}, expect: 0}\n"
+        )
+        results = run_tests(rac_file, test_file)
+        assert [r.error for r in results.results] == ["ExecutionError: undefined: missing"] * 2
+
+    def test_module_parsed_once_while_unchanged(self, simple_pair, monkeypatch):
+        import rac.parser
+
+        parsed = []
+        real_parse = rac.parser.parse
+
+        def counting_parse(source, path=""):
+            parsed.append(path)
+            return real_parse(source, path)
+
+        monkeypatch.setattr(rac.parser, "parse", counting_parse)
+        rac_file, test_file = simple_pair
+        run_tests(rac_file, test_file)
+        run_tests(rac_file, test_file)
+        assert len(parsed) == 1
+
+        rewrite(rac_file, SIMPLE_RAC.replace("0.20", "0.25"))
+        results = run_tests(rac_file, test_file)
+        assert len(parsed) == 2
+        assert results.results[0].actual == 0.25
+
+    def test_collect_deps_deep_chain(self):
+        from types import SimpleNamespace
+
+        from rac.test_runner import _collect_deps
+
+        depth = 5000  # deeper than the default recursion limit
+        variables = {f"v{i}": SimpleNamespace(deps={f"v{i + 1}"}) for i in range(depth)}
+        variables["v0"].deps.add("input")  # not a variable: collected, not followed
+        collected: set[str] = set()
+        _collect_deps("v0", SimpleNamespace(variables=variables), collected)
+        assert collected == set(variables) | {f"v{depth}", "input"}
+
+    def test_compiles_once_per_period(self, simple_pair, monkeypatch):
+        from rac import test_runner
+
+        compiled = []
+        real_compile = test_runner.Compiler.compile
+
+        def counting_compile(self, as_of):
+            compiled.append(as_of)
+            return real_compile(self, as_of)
+
+        monkeypatch.setattr(test_runner.Compiler, "compile", counting_compile)
+        rac_file, test_file = simple_pair
+        results = run_tests(rac_file, test_file)
+        assert results.total == 5
+        assert results.all_passed
+        assert compiled == [date(2024, 1, 1)]
+
+    def test_compiles_once_across_runs_while_unchanged(self, simple_pair, monkeypatch):
+        from rac import test_runner
+
+        compiled = []
+        real_compile = test_runner.Compiler.compile
+
+        def counting_compile(self, as_of):
+            compiled.append(as_of)
+            return real_compile(self, as_of)
+
+        monkeypatch.setattr(test_runner.Compiler, "compile", counting_compile)
+        rac_file, test_file = simple_pair
+        run_tests(rac_file, test_file)
+        run_tests(rac_file, test_file)
+        assert compiled == [date(2024, 1, 1)]
+
+        rewrite(rac_file, SIMPLE_RAC.replace("0.20", "0.25"))
+        results = run_tests(rac_file, test_file)
+        assert compiled == [date(2024, 1, 1)] * 2
+        assert results.results[0].actual == 0.25
+
     def test_temporal_pass(self, temporal_pair):
         rac_file, test_file = temporal_pair
         results = run_tests(rac_file, test_file)
@@ -448,6 +684,34 @@ class TestRunTests:
         assert results.failed == 1
         assert "not found" in results.failures[0].error
 
+    def test_variable_not_in_ir_lists_available_names(self, tmp_path):
+        rac_file = tmp_path / "minimal.rac"
+        test_file = tmp_path / "minimal.rac.test"
+        rac_file.write_text(
+            "variable gov/rate:\n"
+            "    from 2024-01-01: 0.20\n"
+            "variable gov/base:\n"
+            "    from 2024-01-01: 100\n"
+        )
+        test_file.write_text(
+            "nonexistent_var:\n"
+            "  - name: first\n"
+            "    period: 2024-01\n"
+            "    inputs: {}\n"
+            "    expect: 0\n"
+            "  - name: second\n"
+            "    period: 2024-01\n"
+            "    inputs: {}\n"
+            "    expect: 0\n"
+        )
+        results = run_tests(rac_file, test_file)
+        assert results.failed == 2
+        for failure in results.failures:
+            assert failure.error == (
+                "Variable 'nonexistent_var' not found in compiled IR. "
+                "Available: ['gov/base', 'gov/rate']"
+            )
+
 
 # ---------------------------------------------------------------------------
 # Tests: tolerance
@@ -553,6 +817,20 @@ class TestFindTestPairs:
         pairs = find_test_pairs(tmp_path)
         assert len(pairs) == 1
 
+    def test_directory_order_matches_path_sort(self, tmp_path):
+        for rel in ["b.rac.test", "a/z.rac.test", "a-b/y.rac.test", "a/sub/x.rac.test"]:
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text(SIMPLE_TEST)
+        (tmp_path / "dir.rac.test").mkdir()  # directories never count as tests
+
+        pairs = find_test_pairs(tmp_path)
+        assert [t.relative_to(tmp_path).as_posix() for _, t in pairs] == [
+            "a/sub/x.rac.test",
+            "a/z.rac.test",
+            "a-b/y.rac.test",
+            "b.rac.test",
+        ]
+
 
 # ---------------------------------------------------------------------------
 # Tests: run_test_suite
@@ -577,6 +855,20 @@ class TestRunTestSuite:
         assert results.total == 8  # 5 + 3
         assert results.all_passed
 
+    def test_suite_parallel_matches_serial(self, tmp_path, capsys):
+        (tmp_path / "a.rac").write_text(SIMPLE_RAC)
+        (tmp_path / "a.rac.test").write_text(SIMPLE_TEST)
+        (tmp_path / "b.rac").write_text(TEMPORAL_RAC)
+        (tmp_path / "b.rac.test").write_text(TEMPORAL_TEST)
+        (tmp_path / "c.rac.test").write_text(FAILING_TEST)  # no c.rac
+
+        serial = run_test_suite(tmp_path, verbose=True)
+        serial_out = capsys.readouterr().out
+        parallel = run_test_suite(tmp_path, verbose=True, jobs=3)
+        assert parallel.results == serial.results
+        assert capsys.readouterr().out == serial_out
+        assert serial_out.index("a.rac.test") < serial_out.index("b.rac.test")
+
     def test_suite_empty_directory(self, tmp_path):
         results = run_test_suite(tmp_path)
         assert results.total == 0
@@ -683,6 +975,22 @@ class TestCLI:
         captured = capsys.readouterr()
         assert "PASS" in captured.out
 
+    def test_jobs_flag(self, tmp_path, capsys):
+        (tmp_path / "a.rac").write_text(SIMPLE_RAC)
+        (tmp_path / "a.rac.test").write_text(SIMPLE_TEST)
+        (tmp_path / "b.rac").write_text(TEMPORAL_RAC)
+        (tmp_path / "b.rac.test").write_text(TEMPORAL_TEST)
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--jobs", "2", str(tmp_path)])
+        assert exc_info.value.code == 0
+        assert "Tests: 8  Passed: 8" in capsys.readouterr().out
+
+    def test_jobs_flag_missing_value(self, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            main(["-j"])
+        assert exc_info.value.code == 2
+        assert "-j requires a value" in capsys.readouterr().err
+
     def test_tolerance_flag(self, tmp_path, capsys):
         rac_file = tmp_path / "tol.rac"
         test_file = tmp_path / "tol.rac.test"